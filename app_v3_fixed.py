@@ -1,783 +1,374 @@
+import os
+import secrets
+import sys
 import streamlit as st
-import json
-import re
-from collections import defaultdict
-import pandas as pd
 from datetime import datetime
-import io
-import xlsxwriter
+from functools import lru_cache
 
-def parse_assessment_file(file_content):
-    dimensions = []
-    lines = file_content.split('\n')
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        if not line:
-            i += 1
-            continue
-        
-        if re.match(r'^\d+\.', line) and ':' in line:
-            parts = line.split(':', 1)
-            if len(parts) == 2:
-                after_colon = parts[1].strip()
-                # Changed from > 10 to >= 8, and added em dash (–) and en dash (—) support
-                if len(after_colon) >= 8 and (re.search(r'[A-Z]', after_colon) or '-' in after_colon or '–' in after_colon or '—' in after_colon):
-                    dimension_name = line
-                    questions = []
-                    answers = {}
-                    i += 1
-                    
-                    while i < len(lines):
-                        line = lines[i].strip()
-                        
-                        if line.startswith('Answers:'):
-                            i += 1
-                            answer_list = []
-                            while i < len(lines):
-                                line = lines[i].strip()
-                                if line.startswith('*'):
-                                    answer_text = line[1:].strip()
-                                    if ':' in answer_text:
-                                        parts = answer_text.split(':', 1)
-                                        if len(parts) >= 2:
-                                            key = parts[0].strip()
-                                            value = parts[1].strip()
-                                            answers[key] = value
-                                    else:
-                                        answer_list.append(answer_text)
-                                    i += 1
-                                elif not line:
-                                    i += 1
-                                    break
-                                elif re.match(r'^\d+\.', line) and ':' in line:
-                                    test_parts = line.split(':', 1)
-                                    if len(test_parts) == 2:
-                                        test_after = test_parts[1].strip()
-                                        # Changed from > 10 to >= 8, and added dash variants
-                                        if len(test_after) >= 8 and (re.search(r'[A-Z]', test_after) or '-' in test_after or '–' in test_after or '—' in test_after):
-                                            break
-                                    i += 1
-                                else:
-                                    i += 1
-                            
-                            if answer_list and not answers:
-                                for idx, value in enumerate(answer_list):
-                                    answers[chr(65 + idx)] = value
-                            break
-                        
-                        if re.match(r'^\d+\.', line) and ':' in line:
-                            test_parts = line.split(':', 1)
-                            if len(test_parts) == 2:
-                                test_after = test_parts[1].strip()
-                                # Changed from > 10 to >= 8, and added dash variants
-                                if len(test_after) >= 8 and (re.search(r'[A-Z]', test_after) or '-' in test_after or '–' in test_after or '—' in test_after):
-                                    break
-                        
-                        if re.match(r'^Question\s+\d+:', line, re.IGNORECASE):
-                            question_text = re.sub(r'^Question\s+\d+:\s*', '', line, flags=re.IGNORECASE)
-                            options = []
-                            i += 1
-                            
-                            while i < len(lines):
-                                line = lines[i].strip()
-                                if re.match(r'^[a-gA-G]\)', line):
-                                    option = re.sub(r'^[a-gA-G]\)\s*', '', line)
-                                    options.append(option)
-                                    i += 1
-                                else:
-                                    break
-                            
-                            if options:
-                                questions.append({
-                                    'text': question_text,
-                                    'options': options
-                                })
-                        elif re.match(r'^\d+\.', line):
-                            question_text = re.sub(r'^\d+\.\s*', '', line)
-                            options = []
-                            i += 1
-                            
-                            while i < len(lines):
-                                line = lines[i].strip()
-                                if re.match(r'^[a-gA-G]\)', line):
-                                    option = re.sub(r'^[a-gA-G]\)\s*', '', line)
-                                    options.append(option)
-                                    i += 1
-                                else:
-                                    break
-                            
-                            if options:
-                                questions.append({
-                                    'text': question_text,
-                                    'options': options
-                                })
-                        else:
-                            i += 1
-                    
-                    if questions:
-                        dimensions.append({
-                            'name': dimension_name,
-                            'questions': questions,
-                            'answers': answers
-                        })
-                    continue
-        
-        # Handle dimension headers without colons but with parenthetical descriptions
-        # Example: "13. Values (List of Values - Nominalizations...)"
-        if re.match(r'^\d+\.\s+[A-Z]', line) and '(' in line and not ':' in line:
-            # This looks like a dimension header without a colon
-            dimension_name = line
-            questions = []
-            answers = {}
-            i += 1
-            
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if line.startswith('Answers:'):
-                    i += 1
-                    answer_list = []
-                    while i < len(lines):
-                        line = lines[i].strip()
-                        if line.startswith('*'):
-                            answer_text = line[1:].strip()
-                            if ':' in answer_text:
-                                parts = answer_text.split(':', 1)
-                                if len(parts) >= 2:
-                                    key = parts[0].strip()
-                                    value = parts[1].strip()
-                                    answers[key] = value
-                            else:
-                                answer_list.append(answer_text)
-                            i += 1
-                        elif not line:
-                            i += 1
-                            break
-                        elif re.match(r'^\d+\.', line):
-                            # Check if this is a new dimension
-                            if ':' in line or '(' in line:
-                                break
-                            i += 1
-                        else:
-                            i += 1
-                    
-                    if answer_list and not answers:
-                        for idx, value in enumerate(answer_list):
-                            answers[chr(65 + idx)] = value
-                    break
-                
-                # Check for new dimension (stop parsing this one)
-                if re.match(r'^\d+\.', line) and (':' in line or '(' in line):
-                    break
-                
-                if re.match(r'^Question\s+\d+:', line, re.IGNORECASE):
-                    question_text = re.sub(r'^Question\s+\d+:\s*', '', line, flags=re.IGNORECASE)
-                    options = []
-                    i += 1
-                    
-                    while i < len(lines):
-                        line = lines[i].strip()
-                        if re.match(r'^[a-gA-G]\)', line):
-                            option = re.sub(r'^[a-gA-G]\)\s*', '', line)
-                            options.append(option)
-                            i += 1
-                        else:
-                            break
-                    
-                    if options:
-                        questions.append({
-                            'text': question_text,
-                            'options': options
-                        })
-                elif re.match(r'^\d+\.', line):
-                    question_text = re.sub(r'^\d+\.\s*', '', line)
-                    options = []
-                    i += 1
-                    
-                    while i < len(lines):
-                        line = lines[i].strip()
-                        if re.match(r'^[a-gA-G]\)', line):
-                            option = re.sub(r'^[a-gA-G]\)\s*', '', line)
-                            options.append(option)
-                            i += 1
-                        else:
-                            break
-                    
-                    if options:
-                        questions.append({
-                            'text': question_text,
-                            'options': options
-                        })
-                else:
-                    i += 1
-            
-            if questions:
-                dimensions.append({
-                    'name': dimension_name,
-                    'questions': questions,
-                    'answers': answers
-                })
-            continue
-        
-        i += 1
-    
-    return dimensions
+from assessment_core import (
+    ASSESSMENT_FILES,
+    QUESTION_BANK_DIR,
+    load_questionnaire,
+    warm_questionnaire_cache,
+    new_score_tally,
+    update_score_tally,
+    score_tally_from_responses,
+    tally_results,
+    encode_answer_string,
+    decode_answer_string,
+    response_fingerprint,
+    generate_personal_profile,
+    profile_signature,
+)
+from report_cache import ReportCache
+from results_export import available_formats, export_respondent
+from report_jobs import ReportJobQueue, QUEUED, RUNNING, DONE, FAILED
+from narrative import NarrativeGenerator, NarrativeService, make_backend
+from assessment_store import AssessmentStore
+from result_charts import dimension_figure, plotly_available, profile_figure, to_figure
+from state_store import SessionState, StateConflict, StateStore, make_state_backend
 
-def calculate_results(responses, dimensions):
-    results = {}
-    
-    for dim_idx, dimension in enumerate(dimensions):
-        if dim_idx not in responses:
-            continue
-        
-        type_counts = defaultdict(int)
-        answers_map = dimension['answers']
-        
-        for q_idx, answer in responses[dim_idx].items():
-            if answer:
-                answer_upper = answer.upper()
-                if answer_upper in answers_map:
-                    answer_type = answers_map[answer_upper]
-                    type_counts[answer_type] += 1
-        
-        if type_counts:
-            dominant_type = max(type_counts.items(), key=lambda x: x[1])
-            total = sum(type_counts.values())
-            percentage = (dominant_type[1] / total * 100) if total > 0 else 0
-            
-            results[dimension['name']] = {
-                'dominant_type': dominant_type[0],
-                'percentage': percentage,
-                'all_scores': dict(type_counts),
-                'total_questions': total
-            }
-    
-    return results
+@st.cache_resource(show_spinner=False)
+def get_questionnaire():
+    """Questionnaire shared by every session in this process"""
+    return load_questionnaire()
 
-def generate_personal_profile(cognitive_results, conative_results, semantic_results, emotional_results):
-    """Generate comprehensive personal profile based on assessment results"""
-    
-    profile_sections = []
-    
-    # Extract key traits
-    cog_traits = {dim.split(':')[0].strip(): result['dominant_type'] 
-                  for dim, result in cognitive_results.items()}
-    con_traits = {dim.split(':')[0].strip(): result['dominant_type'] 
-                  for dim, result in conative_results.items()}
-    sem_traits = {dim.split(':')[0].strip(): result['dominant_type'] 
-                  for dim, result in semantic_results.items()}
-    emo_traits = {dim.split(':')[0].strip(): result['dominant_type'] 
-                  for dim, result in emotional_results.items()}
-    
-    # GENERAL PERSONALITY
-    personality_lines = ["GENERAL PERSONALITY:", ""]
-    
-    # Cognitive style
-    rep_type = cog_traits.get('1. Representation', 'Visual')
-    personality_lines.append(f"Your primary cognitive processing style is {rep_type}, meaning you best understand and retain information through {rep_type.lower()} channels.")
-    
-    # Learning approach
-    epistemo = cog_traits.get('2. Epistemological', 'Sensor')
-    if 'Sensor' in epistemo:
-        personality_lines.append("You are detail-oriented and prefer concrete, tangible information with practical applications.")
-    else:
-        personality_lines.append("You are conceptual and prefer abstract thinking, seeing patterns and possibilities.")
-    
-    # Decision making
-    scale = cog_traits.get('3. Scale', 'Global')
-    if 'Global' in scale or 'Inductive' in scale:
-        personality_lines.append("You tend to see the big picture first before diving into details.")
-    else:
-        personality_lines.append("You prefer starting with specifics and building up to comprehensive understanding.")
-    
-    # Emotional style
-    surgency = emo_traits.get('3. Exuberance', 'Surgency')
-    if 'Surgency' in surgency:
-        personality_lines.append("You have a bold, confident presence and aren't afraid to speak up.")
-    else:
-        personality_lines.append("You have a reserved, thoughtful demeanor and prefer listening before speaking.")
-    
-    profile_sections.append("\n".join(personality_lines))
-    
-    # SUITABLE CAREER PATHS
-    career_lines = ["", "", "SUITABLE CAREER PATHS:", ""]
-    
-    work_style = emo_traits.get('12. Work Style', 'Independent')
-    dominance = emo_traits.get('11. Dominance', 'Achievement')
-    focus = cog_traits.get('9. Focus', 'Screening')
-    
-    if 'Independent' in work_style:
-        career_lines.append("Best suited for roles with autonomy: Research, Consulting, Freelancing, Entrepreneurship")
-    elif 'Manager' in work_style or 'Leader' in work_style:
-        career_lines.append("Natural leadership abilities: Management, Executive roles, Team Leadership, Project Management")
-    elif 'Team player' in work_style:
-        career_lines.append("Collaborative environments: Team-based roles, Partnership positions, Cooperative projects")
-    
-    if 'Achievement' in dominance:
-        career_lines.append("Goal-oriented roles where you can master skills and deliver high-quality outcomes")
-    elif 'Power' in dominance:
-        career_lines.append("Leadership and influence positions where you can drive initiatives and make decisions")
-    elif 'Affiliation' in dominance:
-        career_lines.append("People-focused roles: HR, Counseling, Team Building, Community Management")
-    
-    # Add specific field recommendations
-    career_lines.append("")
-    career_lines.append("Recommended Fields:")
-    
-    if 'Visual' in rep_type:
-        career_lines.append("- Design, Architecture, Data Visualization, Photography, UI/UX")
-    if 'Auditory' in rep_type:
-        career_lines.append("- Music, Voice Acting, Audio Engineering, Teaching, Public Speaking")
-    if 'Kinesthetic' in rep_type:
-        career_lines.append("- Athletics, Physical Therapy, Surgery, Hands-on Crafts, Dance")
-    
-    profile_sections.append("\n".join(career_lines))
-    
-    # SOCIAL INTERACTIONS
-    social_lines = ["", "", "SOCIAL INTERACTIONS:", ""]
-    
-    attention = emo_traits.get('6. Attention', 'Self')
-    rejuvenation = emo_traits.get('8. Rejuvenation', 'Introvert')
-    presentation = emo_traits.get('10. Societal Presentation', 'Genuine')
-    
-    if 'Introvert' in rejuvenation:
-        social_lines.append("You recharge through solitude and prefer smaller, intimate gatherings over large social events.")
-    else:
-        social_lines.append("You gain energy from social interactions and thrive in group settings.")
-    
-    if 'Self' in attention:
-        social_lines.append("In conversations, you tend to focus on your own perspective and experiences.")
-    else:
-        social_lines.append("You are naturally attuned to others' needs and perspectives in social situations.")
-    
-    if 'Genuine' in presentation or 'Artlessly' in presentation:
-        social_lines.append("You value authenticity and prefer straightforward, honest communication.")
-    else:
-        social_lines.append("You are diplomatically skilled and adapt your approach based on social context.")
-    
-    profile_sections.append("\n".join(social_lines))
-    
-    # RELATIONSHIPS
-    relationship_lines = ["", "", "RELATIONSHIPS:", ""]
-    
-    self_exp = sem_traits.get('1. Self-Experience', 'Mind')
-    emotional_contain = emo_traits.get('7. Emotional Containment', 'Contain')
-    movie_pos = emo_traits.get('2. Movie Position', 'Associated')
-    
-    if 'Emotions' in self_exp:
-        relationship_lines.append("You connect with others primarily through emotional bonds and shared feelings.")
-    elif 'Mind' in self_exp:
-        relationship_lines.append("You build relationships through intellectual connection and meaningful conversations.")
-    elif 'Body' in self_exp:
-        relationship_lines.append("Physical presence and shared activities form the foundation of your relationships.")
-    
-    if 'Contain' in emotional_contain:
-        relationship_lines.append("You tend to keep emotions private, sharing deep feelings only with those closest to you.")
-    elif 'Spread' in emotional_contain:
-        relationship_lines.append("You openly share your emotions and appreciate when others do the same.")
-    
-    if 'Associated' in movie_pos:
-        relationship_lines.append("You experience relationships fully, being emotionally present and engaged in the moment.")
-    else:
-        relationship_lines.append("You maintain some emotional distance, which helps you stay objective in relationships.")
-    
-    profile_sections.append("\n".join(relationship_lines))
-    
-    # COMMUNICATION STYLE
-    comm_lines = ["", "", "COMMUNICATION STYLE:", ""]
-    
-    communication = cog_traits.get('11. Communication', 'Verbal')
-    stress_coping = emo_traits.get('4. Stress Coping', 'Assertive')
-    
-    if 'Verbal' in communication or 'Digital' in communication:
-        comm_lines.append("You communicate best through words, whether spoken or written.")
-    else:
-        comm_lines.append("You communicate through non-verbal cues, tone, and body language as much as words.")
-    
-    if 'Passive' in stress_coping:
-        comm_lines.append("You tend to avoid confrontation and may need time to process before responding.")
-    elif 'Assertive' in stress_coping:
-        comm_lines.append("You express your needs clearly while respecting others' perspectives.")
-    elif 'Aggressive' in stress_coping:
-        comm_lines.append("Under stress, you may become forceful in expressing your viewpoint.")
-    
-    profile_sections.append("\n".join(comm_lines))
-    
-    # DECISION MAKING & VALUES
-    decision_lines = ["", "", "DECISION MAKING & VALUES:", ""]
-    
-    authority = emo_traits.get('5. Authority Source', 'Internal')
-    self_instruction = sem_traits.get('2. Self -Instruction', 'Neutral')
-    quality_life = sem_traits.get('12. Quality of Life', 'Be')
-    
-    if 'Internal' in authority:
-        decision_lines.append("You trust your own judgment and make decisions based on internal values and beliefs.")
+DB_PATH = os.environ.get('NLP_DB_PATH', os.path.join(QUESTION_BANK_DIR, 'assessments.db'))
+
+@st.cache_resource(show_spinner=False)
+def get_assessment_store():
+    """Answer and result database shared by every session, or None when disabled"""
+    if not DB_PATH:
+        return None
+    return AssessmentStore(DB_PATH, flush_interval=float(os.environ.get('NLP_DB_FLUSH_INTERVAL', '0.05')))
+
+@st.cache_resource(show_spinner=False)
+def get_state_store():
+    """Session progress store shared by every session, or None when disabled"""
+    backend = os.environ.get('NLP_STATE_BACKEND', 'sqlite' if DB_PATH else 'memory')
+    if backend == 'none':
+        return None
+    # SQLite states are written by the assessment store's batched writer,
+    # in the same transactions as the answers they include
+    return StateStore(make_state_backend(backend, DB_PATH, get_assessment_store()),
+                      max_entries=int(os.environ.get('NLP_STATE_CACHE_SIZE', '1024')),
+                      ttl=float(os.environ.get('NLP_STATE_CACHE_TTL', '2')))
+
+def _apply_session_state(state, questionnaire):
+    """Make a stored SessionState this session's progress.
+
+    Raises ValueError, leaving the session as it was, if the state was saved
+    against another questionnaire version or its answers do not decode.
+    """
+    if state.questionnaire_version != questionnaire.version:
+        raise ValueError(f"state saved for questionnaire {state.questionnaire_version}, "
+                         f"not {questionnaire.version}")
+    section_responses = {
+        section_key: decode_answer_string(state.answers[section_key], questionnaire.sections[section_key])
+        if state.answers.get(section_key) else {}
+        for section_key, filename in ASSESSMENT_FILES
+    }
+    st.session_state.client_id = state.client_id
+    st.session_state.client_name = state.client_name
+    st.session_state.questionnaire_version = state.questionnaire_version
+    st.session_state.current_section = state.current_section
+    st.session_state.current_dimension = state.current_dimension
+    st.session_state.assessment_complete = state.complete
+    st.session_state.saved_position = (state.current_section, state.current_dimension, state.complete)
+    st.session_state.saved_state = state
+    # Radios keep their last value under their own key and would write it
+    # back over the loaded answers; without it they render from the answers
+    for key in [key for key in st.session_state if key.startswith('q_')]:
+        del st.session_state[key]
+    for section_key, responses in section_responses.items():
+        st.session_state[f'{section_key}_responses'] = responses
+        st.session_state[f'{section_key}_tally'] = score_tally_from_responses(
+            responses, questionnaire.sections[section_key])
+    st.query_params['resume'] = state.client_id
+
+def _current_session_state(questionnaire):
+    saved = st.session_state.get('saved_state')
+    version = saved.version if saved is not None and saved.client_id == st.session_state.client_id else 0
+    return SessionState(
+        st.session_state.client_id, st.session_state.client_name, st.session_state.questionnaire_version,
+        st.session_state.current_section, st.session_state.current_dimension,
+        st.session_state.assessment_complete,
+        {section_key: encode_answer_string(st.session_state[f'{section_key}_responses'],
+                                           questionnaire.sections[section_key])
+         for section_key, filename in ASSESSMENT_FILES},
+        version
+    )
+
+def _resume_assessment(store, state_store, client_id, questionnaire):
+    """Load a saved assessment into this session.
+
+    False if the code is unknown or its answers belong to another
+    questionnaire version (e.g. saved before the question bank changed).
+    """
+    state = state_store.get(client_id, refresh=True) if state_store is not None else None
+    if state is None and store is not None:
+        saved = store.load_client(client_id)
+        if saved is not None and saved.questionnaire_version == questionnaire.version:
+            state = SessionState(
+                saved.client_id, saved.client_name, saved.questionnaire_version,
+                saved.current_section, saved.current_dimension, saved.complete,
+                {section_key: encode_answer_string(saved.responses.get(section_key, {}),
+                                                   questionnaire.sections[section_key])
+                 for section_key, filename in ASSESSMENT_FILES}
+            )
+    if state is None:
+        return False
+    try:
+        _apply_session_state(state, questionnaire)
+    except ValueError:
+        return False
+    return True
+
+def _save_session_state():
+    """Write this session's progress to the state store if it changed during the run"""
+    state_store = get_state_store()
+    if state_store is None or not st.session_state.get('client_id'):
+        return
+    state = _current_session_state(get_questionnaire())
+    if state == st.session_state.get('saved_state'):
+        return
+    try:
+        st.session_state.saved_state = state_store.put(state)
+    except StateConflict:
+        # Another process saved this session first; the next run loads its
+        # version instead of overwriting it
+        pass
+
+@st.cache_resource(show_spinner=False)
+def get_report_cache():
+    """Generated workbooks shared by every session in this process"""
+    return ReportCache(
+        max_entries=int(os.environ.get('NLP_REPORT_CACHE_SIZE', '32')),
+        cache_dir=os.environ.get('NLP_REPORT_CACHE_DIR') or None
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_report_jobs():
+    """Report worker pool shared by every session in this process"""
+    workers = int(os.environ.get('NLP_REPORT_WORKERS', '0')) or None
+    return ReportJobQueue(get_report_cache(), max_workers=workers)
+
+@st.cache_resource(show_spinner=False)
+def get_narrative_service():
+    """Narrative backend shared by every session, or None when not configured"""
+    backend = make_backend()
+    if backend is None:
+        return None
+    cache = ReportCache(
+        max_entries=int(os.environ.get('NLP_NARRATIVE_CACHE_SIZE', '256')),
+        cache_dir=os.environ.get('NLP_NARRATIVE_CACHE_DIR') or None,
+        suffix='.txt'
+    )
+    concurrency = int(os.environ.get('NLP_NARRATIVE_CONCURRENCY', '4'))
+    return NarrativeService(NarrativeGenerator(backend, cache, concurrency=concurrency))
+
+@st.fragment(run_every=0.5)
+def _report_progress(fingerprint):
+    # Only this fragment reruns while the worker builds the workbook; the
+    # full page reruns once to show the download button
+    status = get_report_jobs().status(fingerprint)
+    if status is None or status.state in (DONE, FAILED):
+        st.rerun()
+    if status.state == QUEUED or not status.total_sheets:
+        st.progress(0, text="Waiting for a report worker...")
     else:
-        decision_lines.append("You value external input and seek advice from others when making important decisions.")
-    
-    if 'Strong Will' in self_instruction:
-        decision_lines.append("You prefer autonomy and resist following instructions that don't align with your approach.")
-    elif 'Compliant' in self_instruction:
-        decision_lines.append("You respect structure and are comfortable following established guidelines.")
-    
-    if 'Be' in quality_life:
-        decision_lines.append("You prioritize personal growth and self-awareness over external achievements.")
-    elif 'Do' in quality_life:
-        decision_lines.append("You find fulfillment in accomplishments and tangible results.")
-    elif 'Have' in quality_life:
-        decision_lines.append("You value material success and the accumulation of resources.")
-    
-    profile_sections.append("\n".join(decision_lines))
-    
-    # STRENGTHS & GROWTH AREAS
-    strengths_lines = ["", "", "KEY STRENGTHS:", ""]
-    
-    confidence = sem_traits.get('3. Self Confidence', 'High')
-    esteem = sem_traits.get('4. Self Esteem', 'Unconditional')
-    ego = sem_traits.get('7. Ego Strength', 'Strong')
-    
-    if 'High' in confidence:
-        strengths_lines.append("- Strong self-confidence and belief in your abilities")
-    if 'Unconditional' in esteem:
-        strengths_lines.append("- Stable self-worth not dependent on external validation")
-    if 'Strong' in ego:
-        strengths_lines.append("- Resilient in face of criticism and setbacks")
-    
-    change = emo_traits.get('13. Change Adapter', 'Medium')
-    if 'Early' in change:
-        strengths_lines.append("- Quick to adapt and embrace innovation")
-    
-    responsibility = sem_traits.get('6. Responsibility', 'Responsible')
-    if 'Responsible' in responsibility and 'Over' not in responsibility and 'Under' not in responsibility:
-        strengths_lines.append("- Balanced sense of accountability")
-    
-    profile_sections.append("\n".join(strengths_lines))
-    
-    # TIME ORIENTATION
-    time_lines = ["", "", "TIME ORIENTATION:", ""]
-    
-    time_zone = sem_traits.get('10. Time Zones', 'Present')
-    time_exp = sem_traits.get('11. Time Experience', 'In Time')
-    
-    if 'Past' in time_zone:
-        time_lines.append("You often reflect on past experiences and learn from history.")
-    elif 'Present' in time_zone:
-        time_lines.append("You focus on the here and now, making the most of current opportunities.")
-    elif 'Future' in time_zone:
-        time_lines.append("You are forward-thinking, constantly planning and preparing for what's ahead.")
-    
-    if 'Sequential' in time_exp:
-        time_lines.append("You approach tasks in an organized, step-by-step manner.")
-    elif 'Random' in time_exp:
-        time_lines.append("You think holistically and may jump between ideas non-linearly.")
-    
-    profile_sections.append("\n".join(time_lines))
-    
-    # STRESS MANAGEMENT
-    stress_lines = ["", "", "STRESS MANAGEMENT:", ""]
-    
-    response = emo_traits.get('9. Somatic Response', 'Reflective')
-    persistence = emo_traits.get('15. Persistence', 'Patient')
-    attitude = emo_traits.get('14. Attitude', 'Serious')
-    
-    if 'Reflective' in response:
-        stress_lines.append("You handle stress by pausing to think through situations before acting.")
+        st.progress(status.sheets_written / status.total_sheets,
+                    text=f"Writing sheets: {status.sheets_written} / {status.total_sheets}")
+
+DEBUG = os.environ.get('NLP_DEBUG', '') not in ('', '0')
+
+# Navigation is a state machine driven by button callbacks. Callbacks run
+# before the script, so every transition renders its new page in a single
+# script run instead of running once, calling st.rerun() and running again.
+
+def _transition():
+    st.session_state.transitions = st.session_state.get('transitions', 0) + 1
+    st.session_state.runs_since_transition = 0
+
+def _go_to(section_idx, dim_idx, complete=False):
+    _transition()
+    st.session_state.current_section = section_idx
+    st.session_state.current_dimension = dim_idx
+    st.session_state.assessment_complete = complete
+
+def _normalize_position(questionnaire):
+    """Move a position past the end of a section (e.g. from an old saved state) on to the next"""
+    while not st.session_state.assessment_complete:
+        section_key = ASSESSMENT_FILES[st.session_state.current_section][0]
+        if st.session_state.current_dimension < len(questionnaire.sections[section_key]):
+            return
+        if st.session_state.current_section < len(ASSESSMENT_FILES) - 1:
+            st.session_state.current_section += 1
+            st.session_state.current_dimension = 0
+        else:
+            st.session_state.assessment_complete = True
+
+def _start_assessment():
+    name = st.session_state.name_input.strip()
+    if not name:
+        st.session_state.start_error = "Please enter your name to continue."
+        return
+    _transition()
+    st.session_state.start_error = None
+    st.session_state.client_name = name
+    st.session_state.questionnaire_version = get_questionnaire().version
+    store = get_assessment_store()
+    if store is not None:
+        st.session_state.client_id = store.start_client(name, st.session_state.questionnaire_version)
     else:
-        stress_lines.append("You manage stress by taking immediate action to address problems.")
-    
-    if 'Patient' in persistence:
-        stress_lines.append("You have the patience to work through long-term challenges steadily.")
+        st.session_state.client_id = secrets.token_urlsafe(8)
+    st.query_params['resume'] = st.session_state.client_id
+
+def _resume_from_code():
+    resume_code = st.session_state.resume_input.strip()
+    if resume_code and _resume_assessment(get_assessment_store(), get_state_store(),
+                                          resume_code, get_questionnaire()):
+        _transition()
+        st.session_state.resume_error = None
     else:
-        stress_lines.append("You prefer quick results and may become restless with slow progress.")
-    
-    if 'Playful' in attitude:
-        stress_lines.append("You use humor and lightheartedness to diffuse tension.")
+        st.session_state.resume_error = "No saved assessment found for that code."
+
+def _start_new_assessment():
+    _transition()
+    st.session_state.client_name = ""
+    st.session_state.client_id = None
+    st.query_params.pop('resume', None)
+    st.session_state.current_section = 0
+    st.session_state.current_dimension = 0
+    st.session_state.cognitive_responses = {}
+    st.session_state.conative_responses = {}
+    st.session_state.semantic_responses = {}
+    st.session_state.emotional_responses = {}
+    for section_key, filename in ASSESSMENT_FILES:
+        st.session_state[f'{section_key}_tally'] = new_score_tally()
+    st.session_state.assessment_complete = False
+
+@st.fragment
+def _question(section_idx, section_key, dim_idx, q_idx):
+    dimensions = get_questionnaire().sections[section_key]
+    question = dimensions[dim_idx].questions[q_idx - 1]
+    st.markdown(f"**Question {q_idx}:** {question.text}")
+    
+    # Looked up on every run: resuming replaces the responses dicts
+    responses_dict = st.session_state[f'{section_key}_responses']
+    previous_answer = responses_dict.setdefault(dim_idx, {}).get(q_idx)
+    
+    if previous_answer:
+        default_index = ord(previous_answer) - ord('a')
     else:
-        stress_lines.append("You maintain focus and determination when facing difficulties.")
-    
-    profile_sections.append("\n".join(stress_lines))
+        default_index = 0
+    
+    answer = st.radio(
+        f"Select your answer for Question {q_idx}:",
+        options=question.keys,
+        format_func=lambda x, labels=question.labels: labels[ord(x) - ord('a')],
+        key=f"q_{section_idx}_{dim_idx}_{q_idx}",
+        index=default_index,
+        label_visibility="collapsed"
+    )
     
-    return "\n".join(profile_sections)
+    if answer is not None and answer != previous_answer:
+        responses_dict[dim_idx][q_idx] = answer
+        update_score_tally(st.session_state[f'{section_key}_tally'], dimensions,
+                           dim_idx, q_idx, previous_answer, answer)
+        store = get_assessment_store()
+        if store is not None and st.session_state.client_id:
+            store.record_answer(st.session_state.client_id, section_key, dim_idx, q_idx, answer)
+        if previous_answer is not None:
+            # A changed answer arrives as a fragment run, which skips the
+            # save at the end of main(); first answers come from full runs
+            _save_session_state()
+    
+    st.write("")
 
-def create_excel_report(client_name, cognitive_responses, cognitive_dimensions, 
-                       conative_responses, conative_dimensions,
-                       semantic_responses, semantic_dimensions,
-                       emotional_responses, emotional_dimensions):
-    buffer = io.BytesIO()
-    
-    # Calculate results for all sections
-    cognitive_results = calculate_results(cognitive_responses, cognitive_dimensions)
-    conative_results = calculate_results(conative_responses, conative_dimensions)
-    semantic_results = calculate_results(semantic_responses, semantic_dimensions)
-    emotional_results = calculate_results(emotional_responses, emotional_dimensions)
-    
-    # Create workbook
-    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': False})
-    
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#4CAF50',
-        'font_color': 'white',
-        'border': 1
-    })
-    
-    text_wrap_format = workbook.add_format({
-        'text_wrap': True,
-        'valign': 'top'
-    })
-    
-    # 1. SUMMARY SHEET
-    worksheet = workbook.add_worksheet('Summary')
-    worksheet.set_column('A:A', 60)
-    worksheet.set_column('B:B', 35)
-    worksheet.set_column('C:C', 15)
-    worksheet.set_column('D:D', 18)
-    
-    headers = ['Dimension', 'Dominant Type', 'Strength (%)', 'Total Questions']
-    for col, header in enumerate(headers):
-        worksheet.write(1, col, header, header_format)
-    
-    current_row = 2
-    data_start_row = current_row
-    
-    for dim_name, result in cognitive_results.items():
-        worksheet.write(current_row, 0, dim_name)
-        worksheet.write(current_row, 1, result['dominant_type'])
-        worksheet.write(current_row, 2, result['percentage'])
-        worksheet.write(current_row, 3, result['total_questions'])
-        current_row += 1
-    
-    for dim_name, result in conative_results.items():
-        worksheet.write(current_row, 0, dim_name)
-        worksheet.write(current_row, 1, result['dominant_type'])
-        worksheet.write(current_row, 2, result['percentage'])
-        worksheet.write(current_row, 3, result['total_questions'])
-        current_row += 1
-    
-    for dim_name, result in semantic_results.items():
-        worksheet.write(current_row, 0, dim_name)
-        worksheet.write(current_row, 1, result['dominant_type'])
-        worksheet.write(current_row, 2, result['percentage'])
-        worksheet.write(current_row, 3, result['total_questions'])
-        current_row += 1
-    
-    for dim_name, result in emotional_results.items():
-        worksheet.write(current_row, 0, dim_name)
-        worksheet.write(current_row, 1, result['dominant_type'])
-        worksheet.write(current_row, 2, result['percentage'])
-        worksheet.write(current_row, 3, result['total_questions'])
-        current_row += 1
-    
-    data_end_row = current_row - 1
-    
-    if data_end_row >= data_start_row:
-        chart = workbook.add_chart({'type': 'bar'})
-        chart.add_series({
-            'name': 'Strength (%)',
-            'categories': ['Summary', data_start_row, 0, data_end_row, 0],
-            'values': ['Summary', data_start_row, 2, data_end_row, 2],
-            'fill': {'color': '#4CAF50'},
-            'data_labels': {'value': True}
-        })
-        chart.set_title({'name': 'All Dimensions - Complete Profile'})
-        chart.set_x_axis({'name': 'Strength (%)', 'min': 0, 'max': 100})
-        chart.set_y_axis({'name': 'Dimension'})
-        
-        num_dimensions = len(cognitive_results) + len(conative_results) + len(semantic_results) + len(emotional_results)
-        chart_height = max(600, num_dimensions * 20)
-        chart.set_size({'width': 720, 'height': chart_height})
-        chart.set_legend({'position': 'none'})
-        worksheet.insert_chart(1, 5, chart)
-    
-    # 2. ACCUMULATED CHARTS PAGES (right after Summary)
-    if cognitive_results:
-        _create_charts_page(workbook, cognitive_results, 'Cognitive Charts', header_format)
-    if conative_results:
-        _create_charts_page(workbook, conative_results, 'Conative Charts', header_format)
-    if semantic_results:
-        _create_charts_page(workbook, semantic_results, 'Semantic Charts', header_format)
-    if emotional_results:
-        _create_charts_page(workbook, emotional_results, 'Emotional Charts', header_format)
-    
-    # 3. PERSONAL PROFILE (after accumulated charts)
-    profile_text = generate_personal_profile(cognitive_results, conative_results, 
-                                            semantic_results, emotional_results)
-    
-    profile_ws = workbook.add_worksheet('Personal Profile')
-    profile_ws.set_column('A:A', 120)
-    
-    # Title
-    title_format = workbook.add_format({
-        'bold': True,
-        'font_size': 16,
-        'bg_color': '#2196F3',
-        'font_color': 'white',
-        'align': 'center'
-    })
-    profile_ws.merge_range('A1:A2', f'PERSONAL PROFILE - {client_name}', title_format)
-    
-    # Profile content
-    profile_ws.write(3, 0, profile_text, text_wrap_format)
-    
-    # 4. INDIVIDUAL DIMENSION SHEETS
-    _process_dimension_sheets(workbook, cognitive_responses, cognitive_dimensions, cognitive_results, header_format)
-    _process_dimension_sheets(workbook, conative_responses, conative_dimensions, conative_results, header_format)
-    _process_dimension_sheets(workbook, semantic_responses, semantic_dimensions, semantic_results, header_format)
-    _process_dimension_sheets(workbook, emotional_responses, emotional_dimensions, emotional_results, header_format)
-    
-    # 5. INFO SHEET
-    info_ws = workbook.add_worksheet('Info')
-    info_ws.set_column('A:A', 30)
-    info_ws.set_column('B:B', 40)
-    
-    info_data = [
-        ['Field', 'Value'],
-        ['Client Name', client_name],
-        ['Assessment Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-        ['Cognitive Dimensions', len(cognitive_results)],
-        ['Cognitive Questions', sum(r['total_questions'] for r in cognitive_results.values()) if cognitive_results else 0],
-        ['Conative Dimensions', len(conative_results)],
-        ['Conative Questions', sum(r['total_questions'] for r in conative_results.values()) if conative_results else 0],
-        ['Semantic Dimensions', len(semantic_results)],
-        ['Semantic Questions', sum(r['total_questions'] for r in semantic_results.values()) if semantic_results else 0],
-        ['Emotional Dimensions', len(emotional_results)],
-        ['Emotional Questions', sum(r['total_questions'] for r in emotional_results.values()) if emotional_results else 0],
-        ['Total Dimensions', len(cognitive_results) + len(conative_results) + len(semantic_results) + len(emotional_results)],
-        ['Total Questions', sum([
-            sum(r['total_questions'] for r in cognitive_results.values()) if cognitive_results else 0,
-            sum(r['total_questions'] for r in conative_results.values()) if conative_results else 0,
-            sum(r['total_questions'] for r in semantic_results.values()) if semantic_results else 0,
-            sum(r['total_questions'] for r in emotional_results.values()) if emotional_results else 0
-        ])]
-    ]
-    
-    for row_idx, row_data in enumerate(info_data):
-        for col_idx, value in enumerate(row_data):
-            if row_idx == 0:
-                info_ws.write(row_idx, col_idx, value, header_format)
-            else:
-                info_ws.write(row_idx, col_idx, value)
-    
-    workbook.close()
-    buffer.seek(0)
-    return buffer
+RESULT_SECTIONS = [
+    ('cognitive', "🧠 Cognitive (Thinking)"),
+    ('conative', "🎯 Conative (Choosing)"),
+    ('semantic', "🔮 Semantic (Meta)"),
+    ('emotional', "❤️ Emotional (Feeling)"),
+]
 
-def _create_charts_page(workbook, results, sheet_name, header_format):
-    """Create accumulated charts page"""
-    worksheet = workbook.add_worksheet(sheet_name)
-    
-    chart_num = 0
-    for dim_name, result in results.items():
-        clean_name = re.sub(r'^\d+\.', '', dim_name).strip()
-        clean_name = clean_name.split(':')[0].strip()
-        
-        data_col = 26 + (chart_num * 3)
-        worksheet.write(1, data_col, 'Type', header_format)
-        worksheet.write(1, data_col + 1, 'Percentage', header_format)
-        
-        data_row = 2
-        for type_name, count in result['all_scores'].items():
-            percentage = (count / result['total_questions']) * 100
-            worksheet.write(data_row, data_col, type_name)
-            worksheet.write(data_row, data_col + 1, percentage)
-            data_row += 1
-        
-        chart = workbook.add_chart({'type': 'bar'})
-        chart.add_series({
-            'name': 'Percentage',
-            'categories': [sheet_name, 2, data_col, data_row - 1, data_col],
-            'values': [sheet_name, 2, data_col + 1, data_row - 1, data_col + 1],
-            'fill': {'color': '#2196F3'},
-            'data_labels': {'value': True}
-        })
-        chart.set_title({'name': clean_name})
-        chart.set_x_axis({'name': 'Percentage (%)', 'min': 0, 'max': 100})
-        chart.set_y_axis({'name': 'Type'})
-        chart.set_size({'width': 480, 'height': 300})
-        chart.set_legend({'position': 'none'})
-        
-        chart_col = (chart_num % 2) * 8
-        chart_row = (chart_num // 2) * 18 + 1
-        worksheet.insert_chart(chart_row, chart_col, chart)
-        
-        chart_num += 1
+def _result_rows(results):
+    """Hashable form of a section's results, the key for the cached markup below"""
+    return tuple((dim_name, result['dominant_type'], result['percentage'], result['total_questions'],
+                  tuple(result['all_scores'].items()))
+                 for dim_name, result in results.items())
 
-def _process_dimension_sheets(workbook, responses, dimensions, results, header_format):
-    """Create individual dimension sheets"""
-    for dim_idx, dimension in enumerate(dimensions):
-        if dim_idx not in responses:
-            continue
-        
-        dim_name = dimension['name']
-        clean_name = re.sub(r'^\d+\.', '', dim_name).strip()
-        clean_name = clean_name.split(':')[0].strip()
-        sheet_name = clean_name[:31]
-        
-        worksheet = workbook.add_worksheet(sheet_name)
-        worksheet.set_column('A:A', 12)
-        worksheet.set_column('B:B', 60)
-        worksheet.set_column('C:C', 60)
-        
-        headers = ['Question #', 'Question', 'Answer']
-        for col, header in enumerate(headers):
-            worksheet.write(1, col, header, header_format)
-        
-        row_idx = 2
-        for q_idx, question in enumerate(dimension['questions'], 1):
-            answer_key = responses[dim_idx].get(q_idx)
-            answer_text = ''
-            
-            if not answer_key:
-                answer_key = 'N/A'
-            elif answer_key != 'N/A':
-                try:
-                    option_idx = ord(answer_key) - ord('a')
-                    if 0 <= option_idx < len(question['options']):
-                        answer_text = question['options'][option_idx]
-                except (TypeError, ValueError):
-                    answer_key = 'N/A'
-                    answer_text = ''
-            
-            worksheet.write(row_idx, 0, q_idx)
-            worksheet.write(row_idx, 1, question['text'])
-            worksheet.write(row_idx, 2, f"{answer_key}) {answer_text}" if answer_text else answer_key)
-            row_idx += 1
-        
-        if dim_name in results:
-            result = results[dim_name]
-            
-            chart_start_row = row_idx + 3
-            worksheet.write(chart_start_row, 0, 'Type', header_format)
-            worksheet.write(chart_start_row, 1, 'Count', header_format)
-            worksheet.write(chart_start_row, 2, 'Percentage', header_format)
-            
-            chart_data_row = chart_start_row + 1
-            for type_name, count in result['all_scores'].items():
-                percentage = (count / result['total_questions']) * 100
-                worksheet.write(chart_data_row, 0, type_name)
-                worksheet.write(chart_data_row, 1, count)
-                worksheet.write(chart_data_row, 2, percentage)
-                chart_data_row += 1
-            
-            chart = workbook.add_chart({'type': 'bar'})
-            chart.add_series({
-                'name': 'Percentage',
-                'categories': [sheet_name, chart_start_row + 1, 0, chart_data_row - 1, 0],
-                'values': [sheet_name, chart_start_row + 1, 2, chart_data_row - 1, 2],
-                'fill': {'color': '#2196F3'},
-                'data_labels': {'value': True}
-            })
-            chart.set_title({'name': f'{clean_name} - Distribution'})
-            chart.set_x_axis({'name': 'Percentage (%)', 'min': 0, 'max': 100})
-            chart.set_y_axis({'name': 'Type'})
-            chart.set_size({'width': 480, 'height': 300})
-            chart.set_legend({'position': 'none'})
-            worksheet.insert_chart(chart_start_row, 4, chart)
+@lru_cache(maxsize=256)
+def _summary_markdown(rows):
+    lines = ["| Dimension | Dominant Type | Strength |", "|---|---|---|"]
+    lines += [f"| {dim_name} | {dominant_type} | {percentage:.1f}% |"
+              for dim_name, dominant_type, percentage, total, scores in rows]
+    return '\n'.join(lines)
+
+@lru_cache(maxsize=4096)
+def _breakdown_markdown(row):
+    dim_name, dominant_type, percentage, total, scores = row
+    summary = (f"**Dominant Type:** {dominant_type}  \n"
+               f"**Strength:** {percentage:.1f}%  \n"
+               f"**Questions Answered:** {total}")
+    breakdown = "**Score Breakdown:**  \n" + "  \n".join(
+        f"• {type_name}: {count} ({count / total * 100:.0f}%)" for type_name, count in scores)
+    return summary, breakdown
+
+# Figures depend only on the answers, so they are cached under the response
+# fingerprint (the results themselves are not hashed). They are cached as
+# validated Figures, which st.plotly_chart does not validate again; nothing
+# mutates them, so every session can share one object.
+@st.cache_resource(max_entries=256, show_spinner=False)
+def _profile_figure(fingerprint, _section_results):
+    return to_figure(profile_figure(_section_results))
+
+@st.cache_resource(max_entries=4096, show_spinner=False)
+def _dimension_figure(fingerprint, section_key, dim_name, _result):
+    return to_figure(dimension_figure(dim_name, _result))
+
+# Export files likewise depend only on the answers (the profile text is
+# derived from them), so each format is built once per fingerprint
+@st.cache_resource(max_entries=256, show_spinner=False)
+def _export_file(fingerprint, export_format, client_name, _questionnaire, _section_results, _profile_text):
+    return export_respondent(export_format, client_name, _questionnaire, _section_results, _profile_text)
+
+@st.fragment
+def _results_dashboard(fingerprint, section_results):
+    # One tab per section with a summary table; a dimension's breakdown is
+    # rendered only once it is picked, and picking one reruns just this
+    # fragment. The markup is cached per result, figures per fingerprint.
+    charts = plotly_available()
+    if charts:
+        st.plotly_chart(_profile_figure(fingerprint, section_results), key="profile_chart")
+    for tab, (section_key, title) in zip(st.tabs([title for section_key, title in RESULT_SECTIONS]),
+                                         RESULT_SECTIONS):
+        with tab:
+            rows = _result_rows(section_results[section_key])
+            st.markdown(f"## {title} - {len(rows)} Dimensions")
+            st.markdown(_summary_markdown(rows))
+            by_name = {row[0]: row for row in rows}
+            dim_name = st.selectbox("📊 Score breakdown for:", options=list(by_name), index=None,
+                                    placeholder="Choose a dimension", key=f"breakdown_{section_key}")
+            if dim_name is not None:
+                summary, breakdown = _breakdown_markdown(by_name[dim_name])
+                col1, col2 = st.columns([2, 1])
+                col1.markdown(summary)
+                col2.markdown(breakdown)
+                if charts:
+                    st.plotly_chart(_dimension_figure(fingerprint, section_key, dim_name,
+                                                      section_results[section_key][dim_name]),
+                                    key=f"breakdown_chart_{section_key}")
 
 def main():
+    try:
+        _assessment_page()
+    finally:
+        # Also runs when the page ends in st.rerun()
+        _save_session_state()
+
+def _assessment_page():
     st.set_page_config(
         page_title="NLP Complete Assessment", 
         page_icon="🧠", 
@@ -792,29 +383,23 @@ def main():
         </style>
     """, unsafe_allow_html=True)
     
+    st.session_state.runs_since_transition = st.session_state.get('runs_since_transition', 0) + 1
+    if DEBUG:
+        st.sidebar.caption(f"Debug: {st.session_state.runs_since_transition} script run(s) since "
+                           f"transition {st.session_state.get('transitions', 0)}")
+    
     st.title("🧠 NLP Complete Assessment - 4 Dimensions")
     st.markdown("---")
     
-    if 'cognitive_dimensions' not in st.session_state:
-        with open('Cognitive.txt', 'r', encoding='utf-8') as f:
-            cognitive_content = f.read()
-        st.session_state.cognitive_dimensions = parse_assessment_file(cognitive_content)
-    
-    if 'conative_dimensions' not in st.session_state:
-        with open('Conative.txt', 'r', encoding='utf-8') as f:
-            conative_content = f.read()
-        st.session_state.conative_dimensions = parse_assessment_file(conative_content)
-    
-    if 'semantic_dimensions' not in st.session_state:
-        with open('Semantic.txt', 'r', encoding='utf-8') as f:
-            semantic_content = f.read()
-        st.session_state.semantic_dimensions = parse_assessment_file(semantic_content)
-    
-    if 'emotional_dimensions' not in st.session_state:
-        with open('Emotional.txt', 'r', encoding='utf-8') as f:
-            emotional_content = f.read()
-        st.session_state.emotional_dimensions = parse_assessment_file(emotional_content)
+    # Question text is shared process-wide; sessions only keep the version id
+    questionnaire = get_questionnaire()
+    cognitive_dimensions = questionnaire.sections['cognitive']
+    conative_dimensions = questionnaire.sections['conative']
+    semantic_dimensions = questionnaire.sections['semantic']
+    emotional_dimensions = questionnaire.sections['emotional']
     
+    if 'questionnaire_version' not in st.session_state:
+        st.session_state.questionnaire_version = questionnaire.version
     if 'client_name' not in st.session_state:
         st.session_state.client_name = ""
     if 'current_section' not in st.session_state:
@@ -829,14 +414,48 @@ def main():
         st.session_state.semantic_responses = {}
     if 'emotional_responses' not in st.session_state:
         st.session_state.emotional_responses = {}
+    for section_key, filename in ASSESSMENT_FILES:
+        if f'{section_key}_tally' not in st.session_state:
+            st.session_state[f'{section_key}_tally'] = score_tally_from_responses(
+                st.session_state[f'{section_key}_responses'], questionnaire.sections[section_key])
     if 'assessment_complete' not in st.session_state:
         st.session_state.assessment_complete = False
     
+    # A page reload, or a reconnect to another app process, starts a new
+    # session; the resume code in the URL brings the saved progress back.
+    # Later runs read through the state cache in case another process or
+    # tab has moved this session on.
+    store = get_assessment_store()
+    state_store = get_state_store()
+    if 'client_id' not in st.session_state:
+        st.session_state.client_id = None
+        resume_code = st.query_params.get('resume')
+        if resume_code and not _resume_assessment(store, state_store, resume_code, questionnaire):
+            st.query_params.pop('resume', None)
+            st.session_state.resume_error = "No saved assessment found for that code."
+    elif state_store is not None and st.session_state.client_id:
+        state = state_store.get(st.session_state.client_id)
+        saved = st.session_state.get('saved_state')
+        if state is not None and (saved is None or state.version != saved.version):
+            try:
+                _apply_session_state(state, questionnaire)
+            except ValueError:
+                # Saved by a process running another question bank; this
+                # session keeps its own answers
+                pass
+    if store is not None and st.session_state.client_id:
+        position = (st.session_state.current_section, st.session_state.current_dimension,
+                    st.session_state.assessment_complete)
+        if position != st.session_state.get('saved_position'):
+            store.record_position(st.session_state.client_id, *position)
+            st.session_state.saved_position = position
+    _normalize_position(questionnaire)
+    
     sections = [
-        ('cognitive', st.session_state.cognitive_dimensions, st.session_state.cognitive_responses, "", "Part 1 of 4"),
-        ('conative', st.session_state.conative_dimensions, st.session_state.conative_responses, "", "Part 2 of 4"),
-        ('semantic', st.session_state.semantic_dimensions, st.session_state.semantic_responses, "", "Part 3 of 4"),
-        ('emotional', st.session_state.emotional_dimensions, st.session_state.emotional_responses, "", "Part 4 of 4")
+        ('cognitive', cognitive_dimensions, st.session_state.cognitive_responses, "", "Part 1 of 4"),
+        ('conative', conative_dimensions, st.session_state.conative_responses, "", "Part 2 of 4"),
+        ('semantic', semantic_dimensions, st.session_state.semantic_responses, "", "Part 3 of 4"),
+        ('emotional', emotional_dimensions, st.session_state.emotional_responses, "", "Part 4 of 4")
     ]
     
     section_key, dimensions, responses_dict, section_name, section_progress = sections[st.session_state.current_section]
@@ -848,69 +467,52 @@ def main():
         
         col1, col2 = st.columns([2, 1])
         with col1:
-            name = st.text_input("Your Name:", key="name_input")
+            st.text_input("Your Name:", key="name_input")
         
         st.write("")
         
         col1, col2, col3 = st.columns([1, 1, 2])
         with col2:
-            if st.button("Start Assessment", type="primary", use_container_width=True):
-                if name and name.strip():
-                    st.session_state.client_name = name.strip()
-                    st.rerun()
-                else:
-                    st.error("Please enter your name to continue.")
+            st.button("Start Assessment", type="primary", use_container_width=True,
+                      on_click=_start_assessment)
+            if st.session_state.get('start_error'):
+                st.error(st.session_state.start_error)
+                st.session_state.start_error = None
+        
+        if store is not None or state_store is not None:
+            st.write("")
+            st.markdown("##### Continue a saved assessment")
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                st.text_input("Resume code:", key="resume_input")
+            with col2:
+                st.write("")
+                st.write("")
+                st.button("Resume Assessment", use_container_width=True, on_click=_resume_from_code)
+            if st.session_state.get('resume_error'):
+                st.error(st.session_state.resume_error)
+                st.session_state.resume_error = None
     
     elif not st.session_state.assessment_complete:
+        section_idx = st.session_state.current_section
         dim_idx = st.session_state.current_dimension
-        
-        if dim_idx >= len(dimensions):
-            if st.session_state.current_section < 3:
-                st.session_state.current_section += 1
-                st.session_state.current_dimension = 0
-                st.rerun()
-            else:
-                st.session_state.assessment_complete = True
-                st.rerun()
-            return
-        
         dimension = dimensions[dim_idx]
         
         st.markdown(f"### 📋 {section_progress}: {section_name}")
         progress = (dim_idx + 1) / len(dimensions)
         st.progress(progress)
         st.caption(f"Dimension {dim_idx + 1} of {len(dimensions)} in {section_name}")
+        if store is not None or state_store is not None:
+            st.caption(f"Resume code: `{st.session_state.client_id}` (your answers are saved as you go)")
         
         st.markdown("---")
-        st.markdown(f"#### {dimension['name']}")
+        st.markdown(f"#### {dimension.name}")
         st.write("")
         
-        if dim_idx not in responses_dict:
-            responses_dict[dim_idx] = {}
-        
-        for q_idx, question in enumerate(dimension['questions'], 1):
-            st.markdown(f"**Question {q_idx}:** {question['text']}")
-            
-            previous_answer = responses_dict[dim_idx].get(q_idx)
-            
-            if previous_answer:
-                default_index = ord(previous_answer) - ord('a')
-            else:
-                default_index = 0
-            
-            answer = st.radio(
-                f"Select your answer for Question {q_idx}:",
-                options=[chr(97 + i) for i in range(len(question['options']))],
-                format_func=lambda x, opts=question['options']: f"{x}) {opts[ord(x) - ord('a')]}",
-                key=f"q_{st.session_state.current_section}_{dim_idx}_{q_idx}",
-                index=default_index,
-                label_visibility="collapsed"
-            )
-            
-            if answer is not None:
-                responses_dict[dim_idx][q_idx] = answer
-            
-            st.write("")
+        # Each question is its own fragment: an answer click reruns just that
+        # question, not the page, whatever the size of the dimension
+        for q_idx in range(1, len(dimension.questions) + 1):
+            _question(section_idx, section_key, dim_idx, q_idx)
         
         st.markdown("---")
         
@@ -918,144 +520,124 @@ def main():
         
         with col1:
             if dim_idx > 0:
-                if st.button("⬅️ Previous Dimension", type="secondary", use_container_width=True):
-                    st.session_state.current_dimension -= 1
-                    st.rerun()
-            elif st.session_state.current_section > 0:
-                if st.button("⬅️ Previous Section", type="secondary", use_container_width=True):
-                    st.session_state.current_section -= 1
-                    prev_section = sections[st.session_state.current_section]
-                    st.session_state.current_dimension = len(prev_section[1]) - 1
-                    st.rerun()
+                st.button("⬅️ Previous Dimension", type="secondary", use_container_width=True,
+                          on_click=_go_to, args=(section_idx, dim_idx - 1))
+            elif section_idx > 0:
+                st.button("⬅️ Previous Section", type="secondary", use_container_width=True,
+                          on_click=_go_to, args=(section_idx - 1, len(sections[section_idx - 1][1]) - 1))
         
         with col3:
             if dim_idx < len(dimensions) - 1:
-                if st.button("Next Dimension ➡️", type="primary", use_container_width=True):
-                    st.session_state.current_dimension += 1
-                    st.rerun()
+                st.button("Next Dimension ➡️", type="primary", use_container_width=True,
+                          on_click=_go_to, args=(section_idx, dim_idx + 1))
+            elif section_idx < len(sections) - 1:
+                st.button("Continue to Next Part ➡️", type="primary", use_container_width=True,
+                          on_click=_go_to, args=(section_idx + 1, 0))
             else:
-                if st.session_state.current_section < 3:
-                    if st.button("Continue to Next Part ➡️", type="primary", use_container_width=True):
-                        st.session_state.current_section += 1
-                        st.session_state.current_dimension = 0
-                        st.rerun()
-                else:
-                    if st.button("Finish Assessment ✅", type="primary", use_container_width=True):
-                        st.session_state.assessment_complete = True
-                        st.rerun()
+                st.button("Finish Assessment ✅", type="primary", use_container_width=True,
+                          on_click=_go_to, args=(section_idx, dim_idx, True))
     
     else:
         st.success("✅ Assessment Complete!")
         st.markdown("---")
         
-        cognitive_results = calculate_results(st.session_state.cognitive_responses, st.session_state.cognitive_dimensions)
-        conative_results = calculate_results(st.session_state.conative_responses, st.session_state.conative_dimensions)
-        semantic_results = calculate_results(st.session_state.semantic_responses, st.session_state.semantic_dimensions)
-        emotional_results = calculate_results(st.session_state.emotional_responses, st.session_state.emotional_dimensions)
+        # Scores were aggregated answer by answer in the question loop
+        cognitive_results = tally_results(st.session_state.cognitive_tally, cognitive_dimensions)
+        conative_results = tally_results(st.session_state.conative_tally, conative_dimensions)
+        semantic_results = tally_results(st.session_state.semantic_tally, semantic_dimensions)
+        emotional_results = tally_results(st.session_state.emotional_tally, emotional_dimensions)
         
-        st.markdown("### Your Complete Profile Summary")
-        st.write("")
-        
-        st.markdown("## 🧠 Cognitive (Thinking) - 18 Dimensions")
-        for dim_name, result in cognitive_results.items():
-            with st.expander(f"📊 {dim_name}", expanded=False):
-                col1, col2 = st.columns([2, 1])
-                with col1:
-                    st.markdown(f"**Dominant Type:** {result['dominant_type']}")
-                    st.markdown(f"**Strength:** {result['percentage']:.1f}%")
-                    st.markdown(f"**Questions Answered:** {result['total_questions']}")
-                with col2:
-                    st.markdown("**Score Breakdown:**")
-                    for type_name, count in result['all_scores'].items():
-                        percentage = (count / result['total_questions']) * 100
-                        st.markdown(f"• {type_name}: {count} ({percentage:.0f}%)")
-        
-        st.markdown("---")
+        section_results = {'cognitive': cognitive_results, 'conative': conative_results,
+                           'semantic': semantic_results, 'emotional': emotional_results}
         
-        st.markdown("## 🎯 Conative (Choosing) - 14 Dimensions")
-        for dim_name, result in conative_results.items():
-            with st.expander(f"📊 {dim_name}", expanded=False):
-                col1, col2 = st.columns([2, 1])
-                with col1:
-                    st.markdown(f"**Dominant Type:** {result['dominant_type']}")
-                    st.markdown(f"**Strength:** {result['percentage']:.1f}%")
-                    st.markdown(f"**Questions Answered:** {result['total_questions']}")
-                with col2:
-                    st.markdown("**Score Breakdown:**")
-                    for type_name, count in result['all_scores'].items():
-                        percentage = (count / result['total_questions']) * 100
-                        st.markdown(f"• {type_name}: {count} ({percentage:.0f}%)")
-        
-        st.markdown("---")
+        section_responses = {
+            section_key: st.session_state[f'{section_key}_responses']
+            for section_key, filename in ASSESSMENT_FILES
+        }
+        fingerprint = response_fingerprint(st.session_state.client_name, questionnaire, section_responses)
         
-        st.markdown("## 🔮 Semantic (Meta) - 13 Dimensions")
-        for dim_name, result in semantic_results.items():
-            with st.expander(f"📊 {dim_name}", expanded=False):
-                col1, col2 = st.columns([2, 1])
-                with col1:
-                    st.markdown(f"**Dominant Type:** {result['dominant_type']}")
-                    st.markdown(f"**Strength:** {result['percentage']:.1f}%")
-                    st.markdown(f"**Questions Answered:** {result['total_questions']}")
-                with col2:
-                    st.markdown("**Score Breakdown:**")
-                    for type_name, count in result['all_scores'].items():
-                        percentage = (count / result['total_questions']) * 100
-                        st.markdown(f"• {type_name}: {count} ({percentage:.0f}%)")
+        st.markdown("### Your Complete Profile Summary")
+        st.write("")
+        _results_dashboard(fingerprint, section_results)
+        
+        profile_text = generate_personal_profile(cognitive_results, conative_results,
+                                                 semantic_results, emotional_results)
+        if store is not None and st.session_state.client_id and \
+                st.session_state.get('results_saved') != st.session_state.client_id:
+            store.save_results(st.session_state.client_id, section_results, profile_text)
+            st.session_state.results_saved = st.session_state.client_id
+        
+        # Optional AI narrative, streamed on request and cached by trait
+        # signature for every later rerun and respondent with the same traits
+        narrative_service = get_narrative_service()
+        if narrative_service is not None:
+            st.markdown("---")
+            st.markdown("### ✨ Your Narrative Profile")
+            signature = profile_signature(cognitive_results, conative_results,
+                                          semantic_results, emotional_results)
+            narrative_text = narrative_service.cached(signature)
+            if narrative_text is not None:
+                st.markdown(narrative_text)
+            elif st.button("✨ Write My Narrative Profile", use_container_width=True):
+                try:
+                    st.write_stream(narrative_service.stream(signature, profile_text))
+                except Exception as e:
+                    st.error(f"Narrative generation failed: {e}")
         
         st.markdown("---")
+        st.markdown("### Download Your Complete Results")
         
-        st.markdown("## ❤️ Emotional (Feeling) - 15 Dimensions")
-        for dim_name, result in emotional_results.items():
-            with st.expander(f"📊 {dim_name}", expanded=False):
-                col1, col2 = st.columns([2, 1])
-                with col1:
-                    st.markdown(f"**Dominant Type:** {result['dominant_type']}")
-                    st.markdown(f"**Strength:** {result['percentage']:.1f}%")
-                    st.markdown(f"**Questions Answered:** {result['total_questions']}")
-                with col2:
-                    st.markdown("**Score Breakdown:**")
-                    for type_name, count in result['all_scores'].items():
-                        percentage = (count / result['total_questions']) * 100
-                        st.markdown(f"• {type_name}: {count} ({percentage:.0f}%)")
+        # The workbook is built by a background worker when asked for, then
+        # served from the report cache on every later rerun with the same answers
+        report_jobs = get_report_jobs()
+        excel_bytes = report_jobs.result(fingerprint)
         
-        st.markdown("---")
-        st.markdown("### Download Your Complete Results")
+        if excel_bytes is None:
+            status = report_jobs.status(fingerprint)
+            if status is not None and status.state in (QUEUED, RUNNING):
+                _report_progress(fingerprint)
+            else:
+                if status is not None and status.state == FAILED:
+                    st.error(f"Report generation failed: {status.error}")
+                if st.button("📄 Prepare Excel Report", type="primary", use_container_width=True):
+                    report_jobs.submit(fingerprint, st.session_state.client_name, section_responses,
+                                       section_results)
+                    _report_progress(fingerprint)
         
-        excel_buffer = create_excel_report(
-            st.session_state.client_name,
-            st.session_state.cognitive_responses,
-            st.session_state.cognitive_dimensions,
-            st.session_state.conative_responses,
-            st.session_state.conative_dimensions,
-            st.session_state.semantic_responses,
-            st.session_state.semantic_dimensions,
-            st.session_state.emotional_responses,
-            st.session_state.emotional_dimensions
-        )
+        base_filename = f"NLP_Complete_Assessment_{st.session_state.client_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        filename = f"NLP_Complete_Assessment_{st.session_state.client_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        if excel_bytes is not None:
+            filename = base_filename + ".xlsx"
+            
+            st.download_button(
+                label="📥 Download Complete Excel Report (60 Dimensions + Profile)",
+                data=excel_bytes,
+                file_name=filename,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                type="primary",
+                use_container_width=True
+            )
         
-        st.download_button(
-            label="📥 Download Complete Excel Report (60 Dimensions + Profile)",
-            data=excel_buffer,
-            file_name=filename,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            type="primary",
-            use_container_width=True
-        )
+        # The same results without charts: small and instant to produce
+        st.markdown("**Results data only** (for spreadsheets and analytics tools):")
+        export_formats = available_formats()
+        for column, export_format in zip(st.columns(len(export_formats)), export_formats):
+            data, mime, extension = _export_file(fingerprint, export_format, st.session_state.client_name,
+                                                 questionnaire, section_results, profile_text)
+            column.download_button(
+                label=f"📥 {export_format.upper()}",
+                data=data,
+                file_name=base_filename + extension,
+                mime=mime,
+                use_container_width=True
+            )
         
         st.write("")
         
-        if st.button("Start New Assessment", type="secondary"):
-            st.session_state.client_name = ""
-            st.session_state.current_section = 0
-            st.session_state.current_dimension = 0
-            st.session_state.cognitive_responses = {}
-            st.session_state.conative_responses = {}
-            st.session_state.semantic_responses = {}
-            st.session_state.emotional_responses = {}
-            st.session_state.assessment_complete = False
-            st.rerun()
+        st.button("Start New Assessment", type="secondary", on_click=_start_new_assessment)
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ['--warm-cache']:
+        warm_questionnaire_cache()
+    else:
+        main()
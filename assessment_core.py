@@ -0,0 +1,573 @@
+"""Headless assessment core: question bank parsing, scoring and profiles.
+
+Only the standard library is imported here so batch jobs can score
+responses without loading Streamlit, pandas or xlsxwriter. The Streamlit
+app (app_v3_fixed.py) and the Excel writer (excel_report.py) build on it.
+"""
+import re
+import os
+import sys
+import hashlib
+import json
+import pickle
+import tempfile
+from types import MappingProxyType
+from functools import lru_cache
+from collections import defaultdict, namedtuple
+
+# Question banks are looked up next to this module unless overridden
+QUESTION_BANK_DIR = os.environ.get('NLP_QUESTION_BANK_DIR', os.path.dirname(os.path.abspath(__file__)))
+
+ASSESSMENT_FILES = [
+    ('cognitive', 'Cognitive.txt'),
+    ('conative', 'Conative.txt'),
+    ('semantic', 'Semantic.txt'),
+    ('emotional', 'Emotional.txt'),
+]
+
+# Compiled questionnaires are cached on disk keyed by a hash of the file
+# contents. Bump PARSER_VERSION whenever the parsed structure changes.
+QUESTIONNAIRE_CACHE_DIR = os.environ.get('NLP_QUESTIONNAIRE_CACHE_DIR',
+                                         os.path.join(QUESTION_BANK_DIR, '.questionnaire_cache'))
+PARSER_VERSION = 1
+
+# Line kinds produced by the tokenizer. Every line of a question bank is
+# classified exactly once; the parser below is a state machine over these.
+(_BLANK, _ANSWERS, _BULLET, _OPTION, _QUESTION_LABEL,
+ _HEADER, _PAREN_HEADER, _NUMBERED_DELIM, _NUMBERED, _OTHER) = range(10)
+
+_LINE_PATTERN = re.compile(
+    r'\d+\.(?P<gap>\s*)(?P<numbered>.*)'
+    r'|(?i:question)\s+\d+:\s*(?P<question>.*)'
+)
+_OPTION_LETTERS = frozenset('abcdefgABCDEFG')
+_HEADER_MARK = re.compile(r'[A-Z\-\u2013\u2014]')
+
+# A numbered line is a question unless it closes the current dimension.
+# Colon headers only stop at another colon header; parenthetical headers
+# stop at any numbered line containing ':' or '('.
+_NUMBERED_KINDS = frozenset((_HEADER, _PAREN_HEADER, _NUMBERED_DELIM, _NUMBERED))
+_HEADER_STOPS = frozenset((_HEADER,))
+_PAREN_HEADER_STOPS = frozenset((_HEADER, _PAREN_HEADER, _NUMBERED_DELIM))
+
+_SEEK, _BODY, _OPTIONS, _ANSWER_BLOCK = range(4)
+
+
+def _classify_line(raw_line):
+    """Return (kind, line, text) for a single line of a question bank"""
+    line = raw_line.strip()
+    if not line:
+        return _BLANK, line, line
+    if line.startswith('Answers:'):
+        return _ANSWERS, line, line
+    if line.startswith('*'):
+        return _BULLET, line, line[1:].strip()
+    if line[1:2] == ')' and line[0] in _OPTION_LETTERS:
+        return _OPTION, line, line[2:].lstrip()
+
+    match = _LINE_PATTERN.match(line)
+    if match is None:
+        return _OTHER, line, line
+
+    text = match.group('numbered')
+    if text is not None:
+        if ':' in text:
+            # Dimension headers have at least 8 characters after the colon
+            # and contain a capital letter or a dash (-, en dash or em dash)
+            after_colon = text.split(':', 1)[1].strip()
+            if len(after_colon) >= 8 and _HEADER_MARK.search(after_colon):
+                return _HEADER, line, text
+            return _NUMBERED_DELIM, line, text
+        if '(' in text:
+            # Example: "13. Values (List of Values - Nominalizations...)"
+            if match.group('gap') and 'A' <= text[0] <= 'Z':
+                return _PAREN_HEADER, line, text
+            return _NUMBERED_DELIM, line, text
+        return _NUMBERED, line, text
+
+    return _QUESTION_LABEL, line, match.group('question')
+
+
+def parse_assessment_file(file_content):
+    dimensions = []
+    state = _SEEK
+    stops = _HEADER_STOPS
+    dimension_name = None
+    questions = answers = answer_list = None
+    question_text = options = None
+
+    def close_dimension():
+        if answer_list and not answers:
+            for idx, value in enumerate(answer_list):
+                answers[chr(65 + idx)] = value
+        if questions:
+            dimensions.append({
+                'name': dimension_name,
+                'questions': questions,
+                'answers': answers
+            })
+
+    tokens = [_classify_line(line) for line in file_content.split('\n')]
+    i = 0
+    while i < len(tokens):
+        kind, line, text = tokens[i]
+
+        if state == _SEEK:
+            if kind == _HEADER or kind == _PAREN_HEADER:
+                dimension_name = line
+                questions = []
+                answers = {}
+                answer_list = []
+                stops = _HEADER_STOPS if kind == _HEADER else _PAREN_HEADER_STOPS
+                state = _BODY
+            i += 1
+
+        elif state == _OPTIONS:
+            if kind == _OPTION:
+                options.append(text)
+                i += 1
+            else:
+                if options:
+                    questions.append({
+                        'text': question_text,
+                        'options': options
+                    })
+                state = _BODY
+
+        elif state == _BODY:
+            if kind == _ANSWERS:
+                state = _ANSWER_BLOCK
+                i += 1
+            elif kind in stops:
+                close_dimension()
+                state = _SEEK
+            elif kind == _QUESTION_LABEL or kind in _NUMBERED_KINDS:
+                question_text = text
+                options = []
+                state = _OPTIONS
+                i += 1
+            else:
+                i += 1
+
+        else:  # _ANSWER_BLOCK
+            if kind == _BULLET:
+                if ':' in text:
+                    key, value = text.split(':', 1)
+                    answers[key.strip()] = value.strip()
+                else:
+                    answer_list.append(text)
+                i += 1
+            elif kind == _BLANK:
+                close_dimension()
+                state = _SEEK
+                i += 1
+            elif kind in stops:
+                close_dimension()
+                state = _SEEK
+            else:
+                i += 1
+
+    if state == _OPTIONS and options:
+        questions.append({
+            'text': question_text,
+            'options': options
+        })
+    if state != _SEEK:
+        close_dimension()
+
+    return dimensions
+
+def questionnaire_digest(raw_content):
+    """Content hash identifying one version of a question bank"""
+    digest = hashlib.sha256(f'parser-v{PARSER_VERSION}:'.encode('ascii'))
+    digest.update(raw_content)
+    return digest.hexdigest()
+
+def load_assessment_file(path, cache_dir=QUESTIONNAIRE_CACHE_DIR):
+    """Load a question bank, reparsing it only when its content changes"""
+    with open(path, 'rb') as f:
+        raw_content = f.read()
+    return _load_compiled(raw_content, questionnaire_digest(raw_content), cache_dir)
+
+def _load_compiled(raw_content, digest, cache_dir):
+    cache_path = os.path.join(cache_dir, digest + '.pickle')
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    dimensions = parse_assessment_file(raw_content.decode('utf-8'))
+
+    # Write to a temp file and rename so concurrent sessions never read a
+    # partially written cache entry
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(dimensions, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return dimensions
+
+OPTION_KEYS = tuple('abcdefg')
+_OPTION_CODES = {key: code for code, key in enumerate(OPTION_KEYS)}
+_NUMBER_PREFIX = re.compile(r'^\d+\.')
+
+class Question(namedtuple('Question', ['text', 'options', 'keys', 'labels'])):
+    """One question: option texts, radio keys ('a', 'b', ...) and 'a) text' labels"""
+    __slots__ = ()
+
+class AnswerKey(namedtuple('AnswerKey', ['by_letter', 'types', 'type_index'])):
+    """Letter -> type mapping plus the distinct types and a per-option type index.
+
+    ``type_index[i]`` is the position in ``types`` scored by option ``i``
+    (0 for 'a'), or -1 when that letter has no type.
+    """
+    __slots__ = ()
+
+class Dimension(namedtuple('Dimension', ['name', 'short_name', 'clean_name', 'sheet_name',
+                                         'questions', 'answer_key'])):
+    """A compiled dimension with the display names reports need precomputed"""
+    __slots__ = ()
+
+class Questionnaire(namedtuple('Questionnaire', ['version', 'sections'])):
+    """All sections of the assessment, keyed by section ('cognitive', ...)"""
+    __slots__ = ()
+
+@lru_cache(maxsize=None)
+def dimension_short_name(dim_name):
+    """'1. Representation: Visual, ...' -> '1. Representation'"""
+    return dim_name.split(':')[0].strip()
+
+@lru_cache(maxsize=None)
+def dimension_clean_name(dim_name):
+    """'1. Representation: Visual, ...' -> 'Representation'"""
+    return _NUMBER_PREFIX.sub('', dim_name).strip().split(':')[0].strip()
+
+def compile_answer_key(answers):
+    by_letter = MappingProxyType({sys.intern(key): sys.intern(value) for key, value in answers.items()})
+    types = tuple(dict.fromkeys(by_letter.values()))
+    type_index = tuple(
+        types.index(by_letter[key.upper()]) if key.upper() in by_letter else -1
+        for key in OPTION_KEYS
+    )
+    return AnswerKey(by_letter, types, type_index)
+
+def compile_dimensions(dimensions):
+    """Immutable, interned Dimension records for a parsed dimension list"""
+    compiled = []
+    for dimension in dimensions:
+        name = sys.intern(dimension['name'])
+        clean_name = sys.intern(dimension_clean_name(name))
+        questions = []
+        for question in dimension['questions']:
+            options = tuple(sys.intern(option) for option in question['options'])
+            keys = OPTION_KEYS[:len(options)]
+            labels = tuple(f"{key}) {option}" for key, option in zip(keys, options))
+            questions.append(Question(sys.intern(question['text']), options, keys, labels))
+        compiled.append(Dimension(
+            name=name,
+            short_name=sys.intern(dimension_short_name(name)),
+            clean_name=clean_name,
+            sheet_name=clean_name[:31],
+            questions=tuple(questions),
+            answer_key=compile_answer_key(dimension['answers'])
+        ))
+    return tuple(compiled)
+
+def load_questionnaire(cache_dir=QUESTIONNAIRE_CACHE_DIR):
+    """Load all sections as one immutable questionnaire.
+
+    The version is a hash over the content of every section file, so two
+    processes serving the same question banks agree on it.
+    """
+    sections = {}
+    version = hashlib.sha256()
+    for section_key, filename in ASSESSMENT_FILES:
+        with open(os.path.join(QUESTION_BANK_DIR, filename), 'rb') as f:
+            raw_content = f.read()
+        digest = questionnaire_digest(raw_content)
+        sections[section_key] = compile_dimensions(_load_compiled(raw_content, digest, cache_dir))
+        version.update(digest.encode('ascii'))
+
+    return Questionnaire(version.hexdigest()[:16], MappingProxyType(sections))
+
+@lru_cache(maxsize=None)
+def process_questionnaire():
+    """The questionnaire loaded once per process, for batch jobs and pool workers"""
+    return load_questionnaire()
+
+def warm_questionnaire_cache(cache_dir=QUESTIONNAIRE_CACHE_DIR):
+    """Compile every bundled question bank into the cache (run at deploy time)"""
+    for section_key, filename in ASSESSMENT_FILES:
+        dimensions = load_assessment_file(os.path.join(QUESTION_BANK_DIR, filename), cache_dir)
+        print(f"{filename}: {len(dimensions)} dimensions cached")
+
+UNANSWERED = '-'
+
+def decode_answer_string(answer_string, dimensions):
+    """'abba-c...' (one letter per question, section order) -> responses dict.
+
+    '-' marks an unanswered question and whitespace is ignored, so answers
+    can be grouped per dimension for readability.
+    """
+    letters = ''.join(answer_string.split()).lower()
+    expected = sum(len(dimension.questions) for dimension in dimensions)
+    if len(letters) != expected:
+        raise ValueError(f"expected {expected} answers, got {len(letters)}")
+
+    responses = {}
+    position = 0
+    for dim_idx, dimension in enumerate(dimensions):
+        answers = {}
+        for q_idx, question in enumerate(dimension.questions, 1):
+            letter = letters[position]
+            position += 1
+            if letter == UNANSWERED:
+                continue
+            if letter not in question.keys:
+                raise ValueError(f"invalid answer {letter!r} for {dimension.short_name}, question {q_idx}")
+            answers[q_idx] = letter
+        if answers:
+            responses[dim_idx] = answers
+    return responses
+
+def encode_answer_string(responses, dimensions):
+    """Inverse of decode_answer_string"""
+    return ''.join(
+        responses.get(dim_idx, {}).get(q_idx) or UNANSWERED
+        for dim_idx, dimension in enumerate(dimensions)
+        for q_idx in range(1, len(dimension.questions) + 1)
+    )
+
+def response_fingerprint(client_name, questionnaire, section_responses):
+    """Stable hash of a client's answers across all sections.
+
+    ``section_responses`` maps section keys to responses dicts. Reports and
+    other outputs derived only from these inputs can be cached under it.
+    """
+    digest = hashlib.sha256(questionnaire.version.encode('ascii'))
+    digest.update(b'\0' + client_name.encode('utf-8'))
+    for section_key, filename in ASSESSMENT_FILES:
+        answer_string = encode_answer_string(section_responses.get(section_key, {}),
+                                             questionnaire.sections[section_key])
+        digest.update(b'\0' + answer_string.encode('utf-8'))
+    return digest.hexdigest()
+
+def calculate_results(responses, dimensions):
+    results = {}
+    
+    for dim_idx, dimension in enumerate(dimensions):
+        if dim_idx not in responses:
+            continue
+        
+        type_counts = defaultdict(int)
+        answers_map = dimension.answer_key.by_letter
+        
+        for q_idx, answer in responses[dim_idx].items():
+            if answer:
+                answer_upper = answer.upper()
+                if answer_upper in answers_map:
+                    answer_type = answers_map[answer_upper]
+                    type_counts[answer_type] += 1
+        
+        if type_counts:
+            dominant_type = max(type_counts.items(), key=lambda x: x[1])
+            total = sum(type_counts.values())
+            percentage = (dominant_type[1] / total * 100) if total > 0 else 0
+            
+            results[dimension.name] = {
+                'dominant_type': dominant_type[0],
+                'percentage': percentage,
+                'all_scores': dict(type_counts),
+                'total_questions': total
+            }
+    
+    return results
+
+def new_score_tally():
+    """Running per-dimension type counts for one section.
+
+    ``masks[dim_idx][t]`` is a bitmask of the question numbers currently
+    scored as type ``t``. Counts are bit counts and the lowest set bit
+    gives the order in which types were first answered, which is what
+    calculate_results uses for all_scores order and tie-breaking.
+    ``results`` caches the result dict of each dimension until it changes.
+    """
+    return {'masks': {}, 'results': {}}
+
+def _answer_type_index(answer_key, answer):
+    code = _OPTION_CODES.get(answer.lower()) if answer else None
+    return -1 if code is None else answer_key.type_index[code]
+
+def update_score_tally(tally, dimensions, dim_idx, q_idx, old_answer, new_answer):
+    """Move one question's vote from its old answer's type to the new one"""
+    answer_key = dimensions[dim_idx].answer_key
+    masks = tally['masks'].get(dim_idx)
+    if masks is None:
+        masks = tally['masks'][dim_idx] = [0] * len(answer_key.types)
+
+    bit = 1 << q_idx
+    old_type = _answer_type_index(answer_key, old_answer)
+    new_type = _answer_type_index(answer_key, new_answer)
+    if old_type >= 0:
+        masks[old_type] &= ~bit
+    if new_type >= 0:
+        masks[new_type] |= bit
+    tally['results'].pop(dim_idx, None)
+
+def score_tally_from_responses(responses, dimensions):
+    """Build a tally for answers that were recorded without one"""
+    tally = new_score_tally()
+    for dim_idx, answers in responses.items():
+        for q_idx, answer in answers.items():
+            update_score_tally(tally, dimensions, dim_idx, q_idx, None, answer)
+    return tally
+
+def _tally_dimension_result(answer_key, masks):
+    first_answered = sorted(((mask & -mask).bit_length(), type_idx)
+                            for type_idx, mask in enumerate(masks) if mask)
+    if not first_answered:
+        return None
+
+    type_counts = {answer_key.types[type_idx]: bin(masks[type_idx]).count('1')
+                   for _, type_idx in first_answered}
+    dominant_type = max(type_counts.items(), key=lambda x: x[1])
+    total = sum(type_counts.values())
+    return {
+        'dominant_type': dominant_type[0],
+        'percentage': dominant_type[1] / total * 100,
+        'all_scores': type_counts,
+        'total_questions': total
+    }
+
+def tally_results(tally, dimensions):
+    """calculate_results() for a section, read from its running tally"""
+    results = {}
+    cached = tally['results']
+    for dim_idx, masks in sorted(tally['masks'].items()):
+        if dim_idx not in cached:
+            cached[dim_idx] = _tally_dimension_result(dimensions[dim_idx].answer_key, masks)
+        if cached[dim_idx] is not None:
+            results[dimensions[dim_idx].name] = cached[dim_idx]
+    return results
+
+# Profile text comes from a rule table (see the description in the file),
+# compiled into per-trait lookups so new rules need no code changes
+PROFILE_RULES_PATH = os.environ.get('NLP_PROFILE_RULES',
+                                    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile_rules.json'))
+PROFILE_SECTION_KEYS = ('cognitive', 'conative', 'semantic', 'emotional')
+# Profiles are memoized by the trait values they read; many respondents
+# share a signature, so this bounds how many distinct texts are kept
+PROFILE_CACHE_SIZE = int(os.environ.get('NLP_PROFILE_CACHE_SIZE', '4096'))
+
+# Each rule reads one trait slot; outcomes memoizes the line every trait
+# value produces, so a rule is evaluated once per distinct dominant type
+# and only looked up after that. The program is every rule in output
+# order, section headers included as constant rules.
+ProfileRule = namedtuple('ProfileRule', 'slot cases outcomes')
+ProfileRules = namedtuple('ProfileRules', 'version program trait_slots defaults name_slots')
+
+_UNSEEN = object()
+
+def compile_profile_rules(data):
+    """ProfileRules from the parsed rule table"""
+    # Slot 0 is a constant for rules that do not read a trait
+    trait_slots = {None: 0}
+    defaults = ['']
+    program = []
+    for section in data['sections']:
+        header = ('', '', section['title'], '') if program else (section['title'], '')
+        program.extend(ProfileRule(0, (((), (), line),), {}) for line in header)
+        for rule in section['rules']:
+            trait = tuple(rule['trait']) if 'trait' in rule else None
+            default = rule.get('default', '')
+            if trait not in trait_slots:
+                trait_slots[trait] = len(defaults)
+                defaults.append(default)
+            elif defaults[trait_slots[trait]] != default:
+                raise ValueError(f"conflicting defaults for profile trait {trait}")
+            cases = tuple(
+                (tuple(case.get('contains', ())), tuple(case.get('excludes', ())), case['text'])
+                for case in rule['cases']
+            )
+            program.append(ProfileRule(trait_slots[trait], cases, {}))
+    name_slots = {section_key: {} for section_key in PROFILE_SECTION_KEYS}
+    return ProfileRules(data.get('version', 1), tuple(program), MappingProxyType(trait_slots),
+                        tuple(defaults), name_slots)
+
+@lru_cache(maxsize=None)
+def load_profile_rules(path=PROFILE_RULES_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return compile_profile_rules(json.load(f))
+
+def _rule_outcome(rule, value):
+    line = None
+    for contains, excludes, text in rule.cases:
+        if contains and not any(part in value for part in contains):
+            continue
+        if any(part in value for part in excludes):
+            continue
+        line = text.replace('{type}', value).replace('{type_lower}', value.lower())
+        break
+    rule.outcomes[value] = line
+    return line
+
+def _trait_slots(rules, section_key):
+    # Full dimension name -> trait slot (None if no rule reads it), filled
+    # in as names are first seen
+    name_slots = rules.name_slots[section_key]
+    def slot_for(dim_name):
+        slot = rules.trait_slots.get((section_key, dimension_short_name(dim_name)))
+        name_slots[dim_name] = slot
+        return slot
+    return name_slots, slot_for
+
+def profile_signature(cognitive_results, conative_results, semantic_results, emotional_results,
+                      rules_path=PROFILE_RULES_PATH):
+    """Tuple of the trait values the profile rules read; equal signatures give equal profiles"""
+    rules = load_profile_rules(rules_path)
+    values = list(rules.defaults)
+    for section_key, section_results in zip(PROFILE_SECTION_KEYS, (cognitive_results, conative_results,
+                                                                   semantic_results, emotional_results)):
+        name_slots, slot_for = _trait_slots(rules, section_key)
+        for dim_name, result in section_results.items():
+            slot = name_slots[dim_name] if dim_name in name_slots else slot_for(dim_name)
+            if slot is not None:
+                values[slot] = result['dominant_type']
+    return tuple(values)
+
+def _assemble_profile(rules_path, signature):
+    rules = load_profile_rules(rules_path)
+    lines = []
+    for rule in rules.program:
+        value = signature[rule.slot]
+        line = rule.outcomes.get(value, _UNSEEN)
+        if line is _UNSEEN:
+            line = _rule_outcome(rule, value)
+        if line is not None:
+            lines.append(line)
+    return "\n".join(lines)
+
+_cached_profile = lru_cache(maxsize=PROFILE_CACHE_SIZE)(_assemble_profile)
+
+def configure_profile_cache(maxsize):
+    """Replace the profile cache with an empty one holding up to maxsize texts"""
+    global _cached_profile
+    _cached_profile = lru_cache(maxsize=maxsize)(_assemble_profile)
+
+def profile_cache_info():
+    """(hits, misses, maxsize, currsize) of the profile cache"""
+    return _cached_profile.cache_info()
+
+def generate_personal_profile(cognitive_results, conative_results, semantic_results, emotional_results):
+    """Generate comprehensive personal profile based on assessment results"""
+    signature = profile_signature(cognitive_results, conative_results, semantic_results, emotional_results)
+    return _cached_profile(PROFILE_RULES_PATH, signature)
+
+
+if __name__ == "__main__":
+    warm_questionnaire_cache()
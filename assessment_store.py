@@ -0,0 +1,289 @@
+"""SQLite persistence for clients, their answers and their results.
+
+The database runs in WAL mode with synchronous=NORMAL, so readers never
+block the writer and commits do not fsync. Writes are not executed by the
+caller: record_answer() and friends only put the write on a queue and
+return. A background thread commits whatever has been queued in one
+transaction every flush_interval seconds (a later answer to the same
+question replaces an earlier one in the batch), using the same parameterised statements each time
+so sqlite3 reuses their prepared form. A radio click therefore costs a
+dict update, however slow the disk is. If a batch fails, its writes are
+committed one at a time, so only the offending write is lost.
+
+The session_state table belongs to state_store.SqliteStateBackend, which
+can queue its writes here (record_state) so a session's saved state is
+committed in the same transactions as its answers.
+
+Every client gets a short random id that doubles as a resume code:
+load_client() returns the saved position and answers so an interrupted
+assessment can continue in a new session.
+"""
+import json
+import queue
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    client_id TEXT PRIMARY KEY,
+    client_name TEXT NOT NULL,
+    questionnaire_version TEXT NOT NULL,
+    current_section INTEGER NOT NULL DEFAULT 0,
+    current_dimension INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0,
+    profile TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    client_id TEXT NOT NULL REFERENCES clients(client_id),
+    section TEXT NOT NULL,
+    dimension INTEGER NOT NULL,
+    question INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    answered_at REAL NOT NULL,
+    PRIMARY KEY (client_id, section, dimension, question)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    client_id TEXT NOT NULL REFERENCES clients(client_id),
+    section TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    dominant_type TEXT NOT NULL,
+    percentage REAL NOT NULL,
+    all_scores TEXT NOT NULL,
+    total_questions INTEGER NOT NULL,
+    PRIMARY KEY (client_id, section, dimension)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS session_state (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+_INSERT_CLIENT = """
+INSERT INTO clients (client_id, client_name, questionnaire_version, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?)
+"""
+_UPDATE_POSITION = """
+UPDATE clients SET current_section = ?, current_dimension = ?, complete = ?, updated_at = ?
+WHERE client_id = ?
+"""
+_UPSERT_ANSWER = """
+INSERT INTO responses (client_id, section, dimension, question, answer, answered_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (client_id, section, dimension, question)
+DO UPDATE SET answer = excluded.answer, answered_at = excluded.answered_at
+"""
+_DELETE_RESULTS = "DELETE FROM results WHERE client_id = ?"
+_INSERT_RESULT = """
+INSERT INTO results (client_id, section, dimension, dominant_type, percentage, all_scores, total_questions)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_UPDATE_PROFILE = "UPDATE clients SET profile = ?, updated_at = ? WHERE client_id = ?"
+_INSERT_STATE = """
+INSERT INTO session_state (key, version, data, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (key) DO NOTHING
+"""
+_UPDATE_STATE = "UPDATE session_state SET version = ?, data = ?, updated_at = ? WHERE key = ? AND version = ?"
+
+# Kinds of queued write
+_CLIENT, _POSITION, _ANSWER, _RESULTS, _STATE, _FLUSH, _CLOSE = range(7)
+
+SavedAssessment = namedtuple(
+    'SavedAssessment',
+    'client_id client_name questionnaire_version current_section current_dimension complete responses')
+
+
+def connect(path):
+    """Connection with the pragmas every store connection uses"""
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False, cached_statements=64)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute('PRAGMA foreign_keys=ON')
+    return connection
+
+
+class AssessmentStore:
+    def __init__(self, path, flush_interval=0.05):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.commits = 0
+        self.rows_written = 0
+        self.error = None
+        self._state_conflicts = set()
+
+        writer = connect(path)
+        writer.executescript(SCHEMA)
+        self._reader = connect(path)
+        self._read_lock = threading.Lock()
+
+        # Callers only enqueue; the writer thread coalesces whatever is
+        # queued into one transaction. SimpleQueue.put never blocks, so a
+        # busy writer cannot hold up a click.
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, args=(writer,),
+                                        name='assessment-store', daemon=True)
+        self._thread.start()
+
+    def start_client(self, client_name, questionnaire_version):
+        """Register a new client and return its id (also its resume code)"""
+        client_id = secrets.token_urlsafe(8)
+        now = time.time()
+        self._queue.put((_CLIENT, (client_id, client_name, questionnaire_version, now, now)))
+        return client_id
+
+    def record_position(self, client_id, current_section, current_dimension, complete=False):
+        self._queue.put((_POSITION, (client_id, current_section, current_dimension, int(complete),
+                                     time.time())))
+
+    def record_answer(self, client_id, section_key, dim_idx, q_idx, answer):
+        self._queue.put((_ANSWER, (client_id, section_key, dim_idx, q_idx, answer, time.time())))
+
+    def save_results(self, client_id, section_results, profile_text):
+        """Replace the stored results of a client; section_results maps section keys to results"""
+        self._queue.put((_RESULTS, (client_id, section_results, profile_text)))
+
+    def record_state(self, key, data, expected_version):
+        """Queue a compare-and-set of a session_state row; returns the version it will have.
+
+        A write that finds the row at another version is dropped and
+        reported by take_state_conflict(). Versions are random rather than
+        counted, so a later write based on a dropped one cannot match the
+        row another writer left at the next count.
+        """
+        version = secrets.randbits(62) + 1
+        self._queue.put((_STATE, (key, data, expected_version, version, time.time())))
+        return version
+
+    def take_state_conflict(self, key):
+        """True, once, if a queued state write for key lost to another writer"""
+        try:
+            self._state_conflicts.remove(key)
+        except KeyError:
+            return False
+        return True
+
+    def _write_loop(self, connection):
+        closing = False
+        while not closing:
+            first = self._queue.get()
+            # Let a burst of clicks accumulate into one transaction
+            time.sleep(self.flush_interval)
+            clients, positions, answers, results, states, waiters = [], {}, {}, {}, {}, []
+            items = [first] + [self._queue.get() for _ in range(self._queue.qsize())]
+            for kind, value in items:
+                if kind == _CLIENT:
+                    clients.append(value)
+                elif kind == _POSITION:
+                    positions[value[0]] = value[1:]
+                elif kind == _ANSWER:
+                    answers[value[:4]] = value[4:]
+                elif kind == _RESULTS:
+                    results[value[0]] = value[1:]
+                elif kind == _STATE:
+                    # Successive saves of one session become a single
+                    # compare-and-set against the version the first one read
+                    key, data, expected_version, version, updated_at = value
+                    first_version = states[key][0] if key in states else expected_version
+                    states[key] = (first_version, version, data, updated_at)
+                else:
+                    waiters.append(value)
+                    closing = closing or kind == _CLOSE
+            try:
+                self._write_batch(connection, clients, positions, answers, results, states)
+            except Exception:
+                # Retry the writes one at a time, so a bad row loses only
+                # itself and not the other sessions' answers in the batch
+                failed = self._write_items(connection, clients, positions, answers, results, states)
+                if failed:
+                    print(f"assessment store: {failed} of {len(items) - len(waiters)} writes failed: {self.error}",
+                          file=sys.stderr)
+            for waiter in waiters:
+                waiter.set()
+        connection.close()
+
+    def _write_batch(self, connection, clients, positions, answers, results, states):
+        now = time.time()
+        conflicts = []
+        with connection:
+            connection.executemany(_INSERT_CLIENT, clients)
+            connection.executemany(_UPDATE_POSITION, [
+                value + (client_id,) for client_id, value in positions.items()
+            ])
+            connection.executemany(_UPSERT_ANSWER, [
+                key + value for key, value in answers.items()
+            ])
+            for client_id, (section_results, profile_text) in results.items():
+                connection.execute(_DELETE_RESULTS, (client_id,))
+                connection.executemany(_INSERT_RESULT, [
+                    (client_id, section_key, dim_name, result['dominant_type'], result['percentage'],
+                     json.dumps(result['all_scores'], ensure_ascii=False), result['total_questions'])
+                    for section_key, section in section_results.items()
+                    for dim_name, result in section.items()
+                ])
+                connection.execute(_UPDATE_PROFILE, (profile_text, now, client_id))
+            for key, (expected_version, version, data, updated_at) in states.items():
+                if expected_version == 0:
+                    cursor = connection.execute(_INSERT_STATE, (key, version, data, updated_at))
+                else:
+                    cursor = connection.execute(_UPDATE_STATE, (version, data, updated_at, key, expected_version))
+                if cursor.rowcount != 1:
+                    conflicts.append(key)
+        self._state_conflicts.update(conflicts)
+        self.commits += 1
+        self.rows_written += len(clients) + len(positions) + len(answers) + len(results) + len(states)
+
+    def _write_items(self, connection, clients, positions, answers, results, states):
+        """Commit each write of a failed batch on its own; returns how many still fail"""
+        # Clients first, so the rows that reference them can be written
+        writes = ([([client], {}, {}, {}, {}) for client in clients]
+                  + [([], {client_id: value}, {}, {}, {}) for client_id, value in positions.items()]
+                  + [([], {}, {key: value}, {}, {}) for key, value in answers.items()]
+                  + [([], {}, {}, {client_id: value}, {}) for client_id, value in results.items()]
+                  + [([], {}, {}, {}, {key: value}) for key, value in states.items()])
+        failed = 0
+        for write in writes:
+            try:
+                self._write_batch(connection, *write)
+            except Exception as e:
+                self.error = e
+                failed += 1
+        return failed
+
+    def flush(self):
+        """Block until everything recorded so far is committed"""
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait()
+
+    def load_client(self, client_id):
+        """SavedAssessment for client_id, or None if it is unknown"""
+        self.flush()
+        with self._read_lock:
+            row = self._reader.execute(
+                'SELECT client_name, questionnaire_version, current_section, current_dimension, complete '
+                'FROM clients WHERE client_id = ?', (client_id,)).fetchone()
+            if row is None:
+                return None
+            answers = self._reader.execute(
+                'SELECT section, dimension, question, answer FROM responses WHERE client_id = ?',
+                (client_id,)).fetchall()
+        responses = {}
+        for section_key, dim_idx, q_idx, answer in answers:
+            responses.setdefault(section_key, {}).setdefault(dim_idx, {})[q_idx] = answer
+        client_name, version, current_section, current_dimension, complete = row
+        return SavedAssessment(client_id, client_name, version, current_section, current_dimension,
+                               bool(complete), responses)
+
+    def close(self):
+        """Commit pending writes and stop the writer thread"""
+        self._queue.put((_CLOSE, threading.Event()))
+        self._thread.join()
+        with self._read_lock:
+            self._reader.close()
@@ -0,0 +1,121 @@
+"""Vectorized scoring of many respondents at once.
+
+Answers for one section are encoded as an int8 matrix of shape
+(respondents, questions) holding letter codes: 0 for 'a', 1 for 'b', ...
+and MISSING for unanswered questions. Question columns follow the section's
+dimensions in order, so dimension i owns columns
+``offsets[i]:offsets[i + 1]`` (see question_offsets).
+
+score_batch() produces the same numbers as calculate_results() in
+assessment_core.py, including its tie-break: when two types have the same
+count, the one answered first (in question order) is dominant.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+MISSING = -1
+_LETTER_CODES = {letter: code for code, letter in enumerate('ABCDEFG')}
+
+DimensionScores = namedtuple('DimensionScores', [
+    'name',         # dimension name, as used for calculate_results keys
+    'types',        # type names, indexed by the columns of counts
+    'counts',       # (respondents, types) int32 type counts
+    'first_seen',   # (respondents, types) question position of first hit
+    'totals',       # (respondents,) scored answers; 0 means no result
+    'dominant',     # (respondents,) index into types, -1 when totals == 0
+    'percentages',  # (respondents,) strength of the dominant type
+])
+
+
+def question_offsets(dimensions):
+    """Column where each dimension's questions start, plus the total width"""
+    offsets = [0]
+    for dimension in dimensions:
+        offsets.append(offsets[-1] + len(dimension.questions))
+    return offsets
+
+
+def encode_responses(responses_list, dimensions):
+    """Encode ``{dim_idx: {q_idx: letter}}`` dicts into an answer matrix.
+
+    Question numbers are 1-based as in the Streamlit app. Answers outside
+    a-g, or for questions the dimension does not have, become MISSING.
+    """
+    offsets = question_offsets(dimensions)
+    width = offsets[-1]
+    rows = []
+    for responses in responses_list:
+        row = [MISSING] * width
+        for dim_idx, answers in responses.items():
+            if not 0 <= dim_idx < len(dimensions):
+                continue
+            base = offsets[dim_idx] - 1
+            n_questions = offsets[dim_idx + 1] - offsets[dim_idx]
+            for q_idx, answer in answers.items():
+                if answer and 1 <= q_idx <= n_questions:
+                    row[base + q_idx] = _LETTER_CODES.get(answer.upper(), MISSING)
+        rows.append(row)
+    return np.array(rows, dtype=np.int8).reshape(len(rows), width)
+
+
+def score_batch(codes, dimensions):
+    """Score an answer matrix, returning one DimensionScores per dimension"""
+    codes = np.asarray(codes, dtype=np.int8)
+    offsets = question_offsets(dimensions)
+    n_respondents = codes.shape[0]
+    rows = np.arange(n_respondents)
+
+    scores = []
+    for dim_idx, dimension in enumerate(dimensions):
+        answer_key = dimension.answer_key
+        n_types = len(answer_key.types)
+
+        # The trailing -1 catches MISSING codes through negative indexing
+        lookup = np.array(answer_key.type_index + (-1,), dtype=np.int8)
+        mapped = lookup[codes[:, offsets[dim_idx]:offsets[dim_idx + 1]]]
+        n_questions = mapped.shape[1]
+
+        counts = np.zeros((n_respondents, n_types), dtype=np.int32)
+        first_seen = np.full((n_respondents, n_types), n_questions, dtype=np.int32)
+        for type_idx in range(n_types):
+            hits = mapped == type_idx
+            counts[:, type_idx] = hits.sum(axis=1)
+            np.copyto(first_seen[:, type_idx], hits.argmax(axis=1), where=counts[:, type_idx] > 0)
+        totals = counts.sum(axis=1)
+        answered = totals > 0
+
+        if n_types:
+            # Highest count wins; among equal counts the earliest type wins
+            rank = counts * (n_questions + 1) + (n_questions - first_seen)
+            dominant = rank.argmax(axis=1)
+        else:
+            dominant = np.zeros(n_respondents, dtype=np.intp)
+
+        percentages = np.zeros(n_respondents, dtype=np.float64)
+        if n_types:
+            np.divide(counts[rows, dominant], totals, out=percentages, where=answered)
+            percentages *= 100
+        dominant = np.where(answered, dominant, -1)
+
+        scores.append(DimensionScores(dimension.name, answer_key.types, counts,
+                                      first_seen, totals, dominant, percentages))
+    return scores
+
+
+def respondent_results(scores, row):
+    """calculate_results()-style dict for one row of a score_batch() result"""
+    results = {}
+    for dim_scores in scores:
+        total = int(dim_scores.totals[row])
+        if not total:
+            continue
+        counts = dim_scores.counts[row]
+        order = np.argsort(dim_scores.first_seen[row], kind='stable')
+        results[dim_scores.name] = {
+            'dominant_type': dim_scores.types[dim_scores.dominant[row]],
+            'percentage': float(dim_scores.percentages[row]),
+            'all_scores': {dim_scores.types[t]: int(counts[t]) for t in order if counts[t]},
+            'total_questions': total
+        }
+    return results
@@ -0,0 +1,128 @@
+"""Sustained answer writes per second of AssessmentStore with concurrent sessions.
+
+Each simulated session is a thread that registers a client and then
+answers questions in a loop, as a respondent clicking radios would. The
+batched store is compared with committing every answer on its own, and
+the 99th percentile of time spent inside record_answer (what a click
+waits for) is reported alongside throughput.
+
+Run from the repository root:
+
+    python benchmarks/bench_assessment_store.py --sessions 1 10 50 --seconds 3
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import assessment_store
+from assessment_core import load_questionnaire
+from assessment_store import AssessmentStore
+
+
+class CommitPerWriteStore:
+    """Baseline: every answer is its own transaction on a shared connection"""
+
+    def __init__(self, path):
+        self.connection = assessment_store.connect(path)
+        self.connection.executescript(assessment_store.SCHEMA)
+        self.lock = threading.Lock()
+        self.commits = 0
+
+    def start_client(self, client_name, questionnaire_version):
+        client_id = f"{client_name}-{time.time_ns()}"
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(assessment_store._INSERT_CLIENT,
+                                    (client_id, client_name, questionnaire_version, now, now))
+        return client_id
+
+    def record_answer(self, client_id, section_key, dim_idx, q_idx, answer):
+        with self.lock, self.connection:
+            self.connection.execute(assessment_store._UPSERT_ANSWER,
+                                    (client_id, section_key, dim_idx, q_idx, answer, time.time()))
+            self.commits += 1
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.connection.close()
+
+
+def session(store, questionnaire, number, deadline, think_time, counts, waits):
+    rng = random.Random(number)
+    client_id = store.start_client(f"Respondent {number}", questionnaire.version)
+    questions = [(section_key, dim_idx, q_idx, question.keys)
+                 for section_key, dimensions in questionnaire.sections.items()
+                 for dim_idx, dimension in enumerate(dimensions)
+                 for q_idx, question in enumerate(dimension.questions, 1)]
+    latencies = []
+    while time.perf_counter() < deadline:
+        section_key, dim_idx, q_idx, keys = rng.choice(questions)
+        start = time.perf_counter()
+        store.record_answer(client_id, section_key, dim_idx, q_idx, rng.choice(keys))
+        latencies.append(time.perf_counter() - start)
+        if think_time:
+            time.sleep(think_time)
+    counts[number] = len(latencies)
+    waits[number] = latencies
+
+
+def measure(make_store, questionnaire, sessions, seconds, think_time):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        store = make_store(path)
+        counts = [0] * sessions
+        waits = [None] * sessions
+        deadline = time.perf_counter() + seconds
+        start = time.perf_counter()
+        threads = [threading.Thread(target=session,
+                                    args=(store, questionnaire, number, deadline, think_time, counts, waits))
+                   for number in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Throughput counts only writes that reached the database
+        store.flush()
+        elapsed = time.perf_counter() - start
+        commits = store.commits
+        store.close()
+        stored = sqlite3.connect(path).execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+    latencies = sorted(latency for session_latencies in waits for latency in session_latencies)
+    return sum(counts), elapsed, commits, latencies[int(len(latencies) * 0.99)], stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help="seconds each session waits between answers (default: 0, flat out)")
+    parser.add_argument('--flush-interval', type=float, default=0.05)
+    args = parser.parse_args()
+
+    questionnaire = load_questionnaire()
+    stores = [
+        ('batched', lambda path: AssessmentStore(path, flush_interval=args.flush_interval)),
+        ('per-write', CommitPerWriteStore),
+    ]
+    print(f"{'store':<10} {'sessions':>8} {'writes':>9} {'writes/s':>10} {'commits':>8} "
+          f"{'p99 click ms':>12} {'rows':>7}")
+    for sessions in args.sessions:
+        for name, make_store in stores:
+            written, elapsed, commits, p99, stored = measure(
+                make_store, questionnaire, sessions, args.seconds, args.think_time)
+            print(f"{name:<10} {sessions:>8} {written:>9} {written / elapsed:>10.0f} {commits:>8} "
+                  f"{p99 * 1000:>12.3f} {stored:>7}")
+
+
+if __name__ == '__main__':
+    main()
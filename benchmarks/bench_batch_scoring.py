@@ -0,0 +1,62 @@
+"""Throughput of batch_scoring.score_batch against calculate_results in a loop.
+
+Run from the repository root:
+
+    python benchmarks/bench_batch_scoring.py --respondents 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_core import load_questionnaire, calculate_results
+from batch_scoring import encode_responses, score_batch, respondent_results
+
+
+def random_responses(dimensions, count, rng):
+    return [
+        {dim_idx: {q_idx: rng.choice(question.keys)
+                   for q_idx, question in enumerate(dimension.questions, 1)}
+         for dim_idx, dimension in enumerate(dimensions)}
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--respondents', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    questionnaire = load_questionnaire()
+
+    print(f"{'section':<10} {'loop resp/s':>14} {'batch resp/s':>14} {'batch+encode':>14} {'speedup':>8}")
+    for section_key, dimensions in questionnaire.sections.items():
+        responses_list = random_responses(dimensions, args.respondents, rng)
+
+        start = time.perf_counter()
+        expected = [calculate_results(responses, dimensions) for responses in responses_list]
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        codes = encode_responses(responses_list, dimensions)
+        encode_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = score_batch(codes, dimensions)
+        batch_time = time.perf_counter() - start
+
+        for row in range(0, args.respondents, max(1, args.respondents // 100)):
+            assert respondent_results(scores, row) == expected[row], f"mismatch in row {row}"
+
+        n = args.respondents
+        print(f"{section_key:<10} {n / loop_time:>14,.0f} {n / batch_time:>14,.0f} "
+              f"{n / (batch_time + encode_time):>14,.0f} {loop_time / batch_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
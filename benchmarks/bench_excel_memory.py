@@ -0,0 +1,83 @@
+"""Peak RSS and build time of create_excel_report, in-memory vs streaming.
+
+Each mode runs in a fresh subprocess that builds --concurrent reports at
+the same time (threads), simulating simultaneous completions on one
+Streamlit host. Peak RSS is reported relative to the process baseline
+after imports.
+
+    python benchmarks/bench_excel_memory.py --concurrent 4
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _child(mode, concurrent, seed):
+    from assessment_core import load_questionnaire
+    from excel_report import create_excel_report
+
+    questionnaire = load_questionnaire()
+    rng = random.Random(seed)
+    sections = [questionnaire.sections[key] for key in ('cognitive', 'conative', 'semantic', 'emotional')]
+    responses = [
+        {dim_idx: {q_idx: rng.choice(question.keys) for q_idx, question in enumerate(dimension.questions, 1)}
+         for dim_idx, dimension in enumerate(dimensions)}
+        for dimensions in sections
+    ]
+    args = [arg for pair in zip(responses, sections) for arg in pair]
+
+    def build(_):
+        report = create_excel_report('Benchmark', *args, streaming=(mode == 'streaming'))
+        size = report.seek(0, os.SEEK_END)
+        report.close()
+        return size
+
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrent) as executor:
+        sizes = list(executor.map(build, range(concurrent)))
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({'baseline_mb': baseline, 'peak_mb': _peak_rss_mb(),
+                      'seconds': elapsed, 'bytes': sizes[0]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrent', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', choices=['memory', 'streaming'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.concurrent, args.seed)
+        return
+
+    print(f"{'mode':<10} {'reports':>7} {'baseline MB':>12} {'peak MB':>9} {'delta MB':>9} {'seconds':>8} {'file KB':>8}")
+    for mode in ('memory', 'streaming'):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode,
+             '--concurrent', str(args.concurrent), '--seed', str(args.seed)],
+            check=True, capture_output=True, text=True, cwd=ROOT).stdout
+        stats = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<10} {args.concurrent:>7} {stats['baseline_mb']:>12.1f} {stats['peak_mb']:>9.1f} "
+              f"{stats['peak_mb'] - stats['baseline_mb']:>9.1f} {stats['seconds']:>8.2f} {stats['bytes'] / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Reports per second of report_batch.run against the number of worker processes.
+
+Run from the repository root:
+
+    python benchmarks/bench_report_batch.py --respondents 200 --workers 1 2 4 8
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_core import load_questionnaire, encode_answer_string
+from excel_report import REPORT_PROFILES
+import report_batch
+
+
+def random_records(questionnaire, count, rng):
+    for number in range(1, count + 1):
+        record = {'id': number, 'client_name': f"Respondent {number}"}
+        for section_key, dimensions in questionnaire.sections.items():
+            responses = {dim_idx: {q_idx: rng.choice(question.keys)
+                                   for q_idx, question in enumerate(dimension.questions, 1)}
+                         for dim_idx, dimension in enumerate(dimensions)}
+            record[section_key] = encode_answer_string(responses, dimensions)
+        yield json.dumps(record)
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--respondents', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cores} & set(range(1, cores + 1))))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', choices=REPORT_PROFILES, default='compact')
+    args = parser.parse_args()
+
+    questionnaire = load_questionnaire()
+    lines = '\n'.join(random_records(questionnaire, args.respondents, random.Random(args.seed))) + '\n'
+
+    print(f"{cores} CPU cores available")
+    print(f"{'workers':>7} {'reports':>8} {'seconds':>8} {'reports/s':>10} {'speedup':>8} {'archive MB':>11}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            archive_path = os.path.join(tmp, f"reports_{workers}.zip")
+            start = time.perf_counter()
+            written, skipped, failures = report_batch.run(
+                io.StringIO(lines), 'jsonl', archive_path, workers=workers, report_profile=args.profile)
+            elapsed = time.perf_counter() - start
+            assert written == args.respondents and not failures, (written, failures)
+
+            rate = written / elapsed
+            baseline = baseline or rate
+            print(f"{workers:>7} {written:>8} {elapsed:>8.2f} {rate:>10.1f} {rate / baseline:>7.1f}x "
+                  f"{os.path.getsize(archive_path) / (1024 * 1024):>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""File size and build time of create_excel_report for each report profile.
+
+Run from the repository root:
+
+    python benchmarks/bench_report_profiles.py --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_core import load_questionnaire
+from excel_report import REPORT_PROFILES, create_excel_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--streaming', action='store_true')
+    args = parser.parse_args()
+
+    questionnaire = load_questionnaire()
+    rng = random.Random(args.seed)
+    report_args = []
+    for section_key in ('cognitive', 'conative', 'semantic', 'emotional'):
+        dimensions = questionnaire.sections[section_key]
+        responses = {dim_idx: {q_idx: rng.choice(question.keys)
+                               for q_idx, question in enumerate(dimension.questions, 1)}
+                     for dim_idx, dimension in enumerate(dimensions)}
+        report_args += [responses, dimensions]
+
+    print(f"{'profile':<10} {'sheets':>6} {'charts':>6} {'file KB':>8} {'seconds':>8}")
+    for report_profile in REPORT_PROFILES:
+        times = []
+        for _ in range(args.repeat):
+            sheets = []
+            start = time.perf_counter()
+            report = create_excel_report('Benchmark', *report_args, streaming=args.streaming,
+                                         progress=lambda written, total: sheets.append(total),
+                                         report_profile=report_profile)
+            times.append(time.perf_counter() - start)
+            size = report.seek(0, os.SEEK_END)
+            report.seek(0)
+            charts = report.read().count(b'xl/charts/chart') // 2
+            report.close()
+        print(f"{report_profile:<10} {sheets[-1]:>6} {charts:>6} {size / 1024:>8.0f} {min(times):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Score a stream of assessment responses from the command line.
+
+Each input record is one respondent. JSONL records and CSV rows share the
+same fields:
+
+    id           optional respondent id (defaults to the record number)
+    client_name  optional name used in the output
+    cognitive, conative, semantic, emotional
+                 answers for the section, either as an answer string
+                 (one letter per question in questionnaire order, '-' for
+                 unanswered) or, in JSONL, as {dim_idx: {q_idx: letter}}
+                 with the same 0-based dimension / 1-based question
+                 numbering the Streamlit app uses
+
+Records are read lazily and scored in bounded chunks, optionally across a
+process pool, and results are written as soon as each chunk finishes, so
+memory stays flat regardless of input size. Output order matches input.
+Output is JSONL, CSV or Parquet (see results_export.py).
+
+    python bulk_score.py responses.jsonl -o results.jsonl --workers 4
+    python bulk_score.py answers.csv -o results.csv --chunk-size 5000
+    python bulk_score.py responses.jsonl -o results.parquet
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from assessment_core import (
+    ASSESSMENT_FILES,
+    process_questionnaire,
+    calculate_results,
+    generate_personal_profile,
+    decode_answer_string,
+    UNANSWERED,
+)
+from results_export import result_writer
+
+SECTION_KEYS = [section_key for section_key, filename in ASSESSMENT_FILES]
+
+
+def decode_section(value, dimensions):
+    """Responses dict for a section given as an answer string or a {dim_idx: {q_idx: letter}} dict.
+
+    Raises ValueError for answers the questions do not offer, like
+    decode_answer_string does.
+    """
+    if value is None or value == '':
+        return {}
+    if isinstance(value, str):
+        return decode_answer_string(value, dimensions)
+    responses = {}
+    for dim_key, answers in value.items():
+        dim_idx = int(dim_key)
+        if not 0 <= dim_idx < len(dimensions):
+            raise ValueError(f"no dimension {dim_idx} in this section")
+        dimension = dimensions[dim_idx]
+        decoded = {}
+        for q_key, answer in answers.items():
+            q_idx = int(q_key)
+            if not 1 <= q_idx <= len(dimension.questions):
+                raise ValueError(f"no question {q_idx} in {dimension.short_name}")
+            if answer is None or answer == '' or answer == UNANSWERED:
+                continue
+            letter = answer.lower() if isinstance(answer, str) else answer
+            if letter not in dimension.questions[q_idx - 1].keys:
+                raise ValueError(f"invalid answer {answer!r} for {dimension.short_name}, question {q_idx}")
+            decoded[q_idx] = letter
+        if decoded:
+            responses[dim_idx] = decoded
+    return responses
+
+
+def score_record(record, number):
+    """Results and profile for one input record"""
+    # Pool workers each load the questionnaire from the on-disk cache
+    # rather than receiving it through pickling
+    questionnaire = process_questionnaire()
+    output = {
+        'id': record['id'] if record.get('id') is not None else number,
+        'client_name': record.get('client_name', ''),
+    }
+    try:
+        results = {
+            section_key: calculate_results(
+                decode_section(record.get(section_key), questionnaire.sections[section_key]),
+                questionnaire.sections[section_key])
+            for section_key in SECTION_KEYS
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        output['error'] = str(e)
+        return output
+
+    output['results'] = results
+    output['profile'] = generate_personal_profile(
+        results['cognitive'], results['conative'], results['semantic'], results['emotional'])
+    return output
+
+
+def score_chunk(chunk):
+    """Score a list of (record number, raw record) pairs.
+
+    Raw records are JSON lines or CSV row dicts; JSON is decoded here so the
+    work happens in the pool worker rather than the reading process.
+    """
+    scored = []
+    for number, raw in chunk:
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except json.JSONDecodeError as e:
+                scored.append({'id': number, 'client_name': '', 'error': f"invalid JSON: {e}"})
+                continue
+        if not isinstance(raw, dict):
+            scored.append({'id': number, 'client_name': '',
+                           'error': f"expected a JSON object, got {type(raw).__name__}"})
+            continue
+        scored.append(score_record(raw, number))
+    return scored
+
+
+def read_records(stream, input_format):
+    """Yield (record number, raw record) lazily from a JSONL or CSV stream"""
+    if input_format == 'csv':
+        yield from enumerate(csv.DictReader(stream), 1)
+    else:
+        number = 0
+        for line in stream:
+            if line.strip():
+                number += 1
+                yield number, line
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bounded_map(executor, fn, iterable, max_pending):
+    # Like executor.map, but only keeps max_pending chunks in flight so the
+    # input is never read far ahead of the output
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def detect_format(path, explicit):
+    if explicit:
+        return explicit
+    if path.lower().endswith('.parquet'):
+        return 'parquet'
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def run(input_stream, input_format, output_stream, output_format, chunk_size=1000, workers=1):
+    """Score every record of input_stream, writing results chunk by chunk"""
+    writer = result_writer(output_format, output_stream, process_questionnaire())
+    chunks = chunked(read_records(input_stream, input_format), chunk_size)
+
+    count = 0
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for scored in bounded_map(executor, score_chunk, chunks, max_pending=workers * 2):
+                    writer.write(scored)
+                    count += len(scored)
+        else:
+            for chunk in chunks:
+                scored = score_chunk(chunk)
+                writer.write(scored)
+                count += len(scored)
+    finally:
+        # Parquet files only get their footer when the writer is closed
+        writer.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score assessment responses in bulk.")
+    parser.add_argument('input', help="JSONL or CSV file of responses, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('--input-format', choices=['jsonl', 'csv'])
+    parser.add_argument('--output-format', choices=['jsonl', 'csv', 'parquet'])
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help="records scored per chunk (default: 1000)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes to spread chunks across (default: 1, 0 for all cores)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    input_format = detect_format(args.input, args.input_format)
+    output_format = detect_format(args.output, args.output_format)
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    if output_format == 'parquet':
+        output_stream = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    else:
+        output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        count = run(input_stream, input_format, output_stream, output_format,
+                    chunk_size=max(1, args.chunk_size), workers=workers)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream not in (sys.stdout, sys.stdout.buffer):
+            output_stream.close()
+
+    print(f"Scored {count} respondents", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Check that resuming an interrupted report_batch run keeps every report.
+
+Each scenario writes a finished archive of three reports, starts a run
+that adds two more and interrupts it, then runs the same command again.
+Interruptions are an exception (the archive is closed on the way out) or
+a crash of the process (nothing is cleaned up), either before or after
+the first new report is written. Afterwards the archive must hold all
+five reports and no journal, and the first three must be the original
+members rather than rebuilt ones.
+
+Run from the repository root:
+
+    python checks/check_archive_resume.py
+"""
+import io
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_core import load_questionnaire, encode_answer_string
+import report_batch
+
+SCENARIOS = [
+    ('exception before the first new report', False, 3),
+    ('exception after one new report', False, 4),
+    ('crash before the first new report', True, 3),
+    ('crash after one new report', True, 4),
+]
+
+
+def make_lines(count, seed=0):
+    questionnaire = load_questionnaire()
+    rng = random.Random(seed)
+    lines = []
+    for number in range(count):
+        record = {'id': f"r{number}", 'client_name': f"n{number}"}
+        for section_key, dimensions in questionnaire.sections.items():
+            responses = {dim_idx: {q_idx: rng.choice(question.keys)
+                                   for q_idx, question in enumerate(dimension.questions, 1)}
+                         for dim_idx, dimension in enumerate(dimensions)}
+            record[section_key] = encode_answer_string(responses, dimensions)
+        lines.append(json.dumps(record) + '\n')
+    return lines
+
+
+class InterruptedInput:
+    """Input lines that stop before line stop_at, by exception or by exiting the process"""
+
+    def __init__(self, lines, stop_at, crash):
+        self.lines = lines
+        self.stop_at = stop_at
+        self.crash = crash
+
+    def __iter__(self):
+        for number, line in enumerate(self.lines):
+            if number == self.stop_at:
+                if self.crash:
+                    os._exit(1)
+                raise KeyboardInterrupt
+            yield line
+
+
+def interrupted_run(lines, archive_path, stop_at, crash):
+    try:
+        report_batch.run(InterruptedInput(lines, stop_at, crash), 'jsonl', archive_path)
+    except KeyboardInterrupt:
+        pass
+
+
+def check(lines, crash, stop_at, tmp):
+    archive_path = os.path.join(tmp, 'reports.zip')
+    report_batch.run(io.StringIO(''.join(lines[:3])), 'jsonl', archive_path)
+    with zipfile.ZipFile(archive_path) as archive:
+        before = {info.filename: (info.header_offset, info.CRC) for info in archive.infolist()}
+
+    if crash:
+        process = multiprocessing.Process(target=interrupted_run, args=(lines, archive_path, stop_at, crash))
+        process.start()
+        process.join()
+    else:
+        interrupted_run(lines, archive_path, stop_at, crash)
+    if not os.path.exists(archive_path + '.journal'):
+        return "the interrupted run left no journal"
+
+    written, skipped, failures = report_batch.run(io.StringIO(''.join(lines)), 'jsonl', archive_path)
+    if failures:
+        return f"resumed run failed: {failures}"
+    if written != len(lines) - stop_at:
+        return f"resumed run wrote {written} reports, expected {len(lines) - stop_at}"
+    if os.path.exists(archive_path + '.journal'):
+        return "the resumed run left its journal behind"
+    with zipfile.ZipFile(archive_path) as archive:
+        names = sorted(archive.namelist())
+        expected = [f"r{number}_n{number}.xlsx" for number in range(len(lines))]
+        if names != expected:
+            return f"archive holds {names}, expected {expected}"
+        bad = archive.testzip()
+        if bad is not None:
+            return f"{bad} is corrupt"
+        kept = {name: (archive.getinfo(name).header_offset, archive.getinfo(name).CRC) for name in before}
+        replaced = sorted(name for name in before if kept[name] != before[name])
+        if replaced:
+            return f"original reports were replaced: {replaced}"
+    return None
+
+
+def main():
+    lines = make_lines(5)
+    failed = 0
+    for label, crash, stop_at in SCENARIOS:
+        with tempfile.TemporaryDirectory() as tmp:
+            error = check(lines, crash, stop_at, tmp)
+        if error is None:
+            print(f"{label}: ok")
+        else:
+            failed += 1
+            print(f"{label}: {error}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
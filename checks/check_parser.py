@@ -0,0 +1,47 @@
+"""Check that parse_assessment_file still parses the bundled question banks as before.
+
+parsed_banks.json holds what the original nested-loop parser returned for
+each bank. It is the reference the single-pass parser was written against,
+so it is not regenerated from the current parser.
+
+Run from the repository root:
+
+    python checks/check_parser.py
+"""
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from assessment_core import parse_assessment_file
+
+EXPECTED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parsed_banks.json')
+
+
+def main():
+    with open(EXPECTED_PATH, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+
+    failed = 0
+    for filename, expected_dimensions in expected.items():
+        with open(os.path.join(ROOT, filename), 'r', encoding='utf-8') as f:
+            dimensions = parse_assessment_file(f.read())
+        if dimensions == expected_dimensions:
+            questions = sum(len(dimension['questions']) for dimension in dimensions)
+            print(f"{filename}: ok ({len(dimensions)} dimensions, {questions} questions)")
+            continue
+        failed += 1
+        print(f"{filename}: differs", file=sys.stderr)
+        for index, (got, want) in enumerate(zip(dimensions, expected_dimensions)):
+            if got != want:
+                print(f"  first difference in dimension {index + 1}: {want.get('name')!r}", file=sys.stderr)
+                break
+        else:
+            print(f"  {len(dimensions)} dimensions, expected {len(expected_dimensions)}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
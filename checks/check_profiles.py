@@ -0,0 +1,56 @@
+"""Check generate_personal_profile against the golden profile texts.
+
+golden_profiles.json holds profiles written by the original if/elif
+implementation. Profiles depend only on each dimension's dominant type,
+so a case lists one dominant type per dimension (null for an unanswered
+one) in the order of "dimensions". The cases were picked so that together
+they reach every case of every rule in profile_rules.json, including
+unusual type strings and missing dimensions. They are the reference for
+the rule table, so they are not regenerated from the current code.
+
+Run from the repository root:
+
+    python checks/check_profiles.py
+"""
+import difflib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_core import PROFILE_SECTION_KEYS, generate_personal_profile
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_profiles.json')
+
+
+def case_results(dimensions, dominant_types):
+    """Results arguments of generate_personal_profile for one golden case"""
+    return [
+        {dim_name: {'dominant_type': dominant_type}
+         for dim_name, dominant_type in zip(dimensions[section_key], dominant_types[section_key])
+         if dominant_type is not None}
+        for section_key in PROFILE_SECTION_KEYS
+    ]
+
+
+def main():
+    with open(GOLDEN_PATH, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+
+    failed = 0
+    for number, case in enumerate(golden['cases'], 1):
+        profile = generate_personal_profile(*case_results(golden['dimensions'], case['dominant_types']))
+        if profile == case['profile']:
+            continue
+        failed += 1
+        print(f"case {number}: profile differs", file=sys.stderr)
+        sys.stderr.writelines(difflib.unified_diff(
+            case['profile'].splitlines(True), profile.splitlines(True), 'expected', 'generated', n=1))
+        print(file=sys.stderr)
+    print(f"{len(golden['cases']) - failed} of {len(golden['cases'])} profiles match")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
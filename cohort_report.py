@@ -0,0 +1,112 @@
+"""Build one cohort workbook from a file of respondents.
+
+Input records use the same JSONL / CSV fields as bulk_score.py. Records are
+read lazily and the workbook is streamed, so memory stays flat for cohorts
+of any size. Records that cannot be decoded are reported and left out.
+
+    python cohort_report.py cohort.jsonl -o cohort.xlsx --charts cohort.html
+
+--charts also writes interactive Plotly charts of every respondent's
+strengths (needs the optional plotly package).
+"""
+import argparse
+import json
+import sys
+
+from assessment_core import ASSESSMENT_FILES, process_questionnaire
+from bulk_score import read_records, decode_section, detect_format
+from excel_report import create_cohort_report
+from result_charts import cohort_figure, plotly_available
+
+SECTION_KEYS = [section_key for section_key, filename in ASSESSMENT_FILES]
+
+
+def decoded_respondents(records, questionnaire, failures, log=None):
+    """Yield (respondent_id, client_name, section_responses) for valid records"""
+    for number, raw in records:
+        try:
+            record = json.loads(raw) if isinstance(raw, str) else raw
+            section_responses = {
+                section_key: decode_section(record.get(section_key), questionnaire.sections[section_key])
+                for section_key in SECTION_KEYS
+            }
+        except (ValueError, TypeError, AttributeError) as e:
+            failures.append((number, str(e)))
+            if log:
+                print(f"record {number}: {e}", file=log)
+            continue
+        respondent_id = record['id'] if record.get('id') is not None else number
+        yield respondent_id, record.get('client_name', ''), section_responses
+
+
+class StrengthCollector:
+    """on_scores callback keeping each respondent's strengths, NaN where unanswered"""
+
+    def __init__(self, questionnaire):
+        self.questionnaire = questionnaire
+        self.chunks = {section_key: [] for section_key in SECTION_KEYS}
+
+    def __call__(self, section_key, dim_idx, dim_scores):
+        import numpy as np
+        chunks = self.chunks[section_key]
+        if dim_idx == 0:
+            chunks.append([])
+        chunks[-1].append(np.where(dim_scores.dominant >= 0, dim_scores.percentages, np.nan)
+                          .astype(np.float32))
+
+    def strengths(self, section_key):
+        """(respondents x dimensions) array for one section"""
+        import numpy as np
+        chunks = self.chunks[section_key]
+        if not chunks:
+            return np.empty((0, len(self.questionnaire.sections[section_key])), dtype=np.float32)
+        return np.concatenate([np.stack(columns, axis=1) for columns in chunks])
+
+
+def write_cohort_charts(path, collector, questionnaire):
+    import plotly.io as pio
+    figures = [cohort_figure(section_key, questionnaire.sections[section_key],
+                             collector.strengths(section_key))
+               for section_key in SECTION_KEYS]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<html><head><meta charset="utf-8"><title>Cohort strengths</title></head><body>\n')
+        for number, figure in enumerate(figures):
+            # The plotly.js bundle is embedded once, with the first figure
+            f.write(pio.to_html(figure, full_html=False, include_plotlyjs=number == 0))
+        f.write('</body></html>\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a cohort workbook from many respondents.")
+    parser.add_argument('input', help="JSONL or CSV file of responses, or - for stdin")
+    parser.add_argument('-o', '--output', required=True, help="workbook to write (.xlsx)")
+    parser.add_argument('--input-format', choices=['jsonl', 'csv'])
+    parser.add_argument('--chunk-size', type=int, default=2000,
+                        help="respondents scored per chunk (default: 2000)")
+    parser.add_argument('--charts', help="also write interactive strength charts to this .html file")
+    args = parser.parse_args(argv)
+    if args.charts and not plotly_available():
+        parser.error("--charts needs the plotly package")
+
+    questionnaire = process_questionnaire()
+    input_format = detect_format(args.input, args.input_format)
+    input_stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    failures = []
+    collector = StrengthCollector(questionnaire) if args.charts else None
+    try:
+        respondents = decoded_respondents(read_records(input_stream, input_format), questionnaire,
+                                          failures, log=sys.stderr)
+        create_cohort_report(respondents, questionnaire, output=args.output,
+                             chunk_size=max(1, args.chunk_size), on_scores=collector)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+
+    if collector is not None:
+        write_cohort_charts(args.charts, collector, questionnaire)
+        print(f"Wrote {args.charts}", file=sys.stderr)
+    print(f"Wrote {args.output} ({len(failures)} records skipped)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
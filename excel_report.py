@@ -0,0 +1,627 @@
+"""Excel workbook export for a completed assessment.
+
+Imported lazily by the Streamlit app so xlsxwriter is only loaded when a
+report is actually built.
+
+Every sheet is written strictly top to bottom, row by row, so the same code
+can run in xlsxwriter's constant_memory mode (streaming=True), which flushes
+each row to disk as soon as the next one starts.
+
+create_cohort_report() summarises many respondents in one workbook; it is
+always streamed, and its aggregates come from batch_scoring.
+"""
+import io
+import itertools
+import tempfile
+from collections import namedtuple
+from datetime import datetime
+
+import xlsxwriter
+
+from assessment_core import ASSESSMENT_FILES, OPTION_KEYS, calculate_results, generate_personal_profile
+
+def _cached_numbers(values):
+    # Chart caches hold numbers at Excel's precision, as xlsxwriter does
+    # when it reads them back from the worksheet
+    return [f"{value:.16g}" for value in values]
+
+# Everything about a section's sheets that does not depend on the answers,
+# compiled once per questionnaire section and shared by every report
+SectionLayout = namedtuple('SectionLayout', 'dimensions chart_slots')
+DimensionLayout = namedtuple('DimensionLayout', 'name clean_name sheet_name chart_title questions')
+QuestionLayout = namedtuple('QuestionLayout', 'number text answer_cells')
+
+_section_layouts = {}
+
+def _answer_cell(question, answer):
+    if not answer:
+        return 'N/A'
+    if answer == 'N/A':
+        return answer
+    try:
+        option_idx = ord(answer) - ord('a')
+        if 0 <= option_idx < len(question.options) and question.options[option_idx]:
+            return question.labels[option_idx]
+    except (TypeError, ValueError):
+        return 'N/A'
+    return answer
+
+def report_layout(dimensions):
+    """Compiled SectionLayout for a section's dimensions (cached)"""
+    cached = _section_layouts.get(id(dimensions))
+    if cached is not None and cached[0] is dimensions:
+        return cached[1]
+    
+    layout = SectionLayout(
+        dimensions=tuple(
+            DimensionLayout(
+                name=dimension.name,
+                clean_name=dimension.clean_name,
+                sheet_name=dimension.sheet_name,
+                chart_title=f'{dimension.clean_name} - Distribution',
+                questions=tuple(
+                    QuestionLayout(q_idx, question.text,
+                                   {key: _answer_cell(question, key) for key in OPTION_KEYS})
+                    for q_idx, question in enumerate(dimension.questions, 1)
+                )
+            )
+            for dimension in dimensions
+        ),
+        # (data column, chart row, chart column) of each chart on a charts
+        # page: data side by side from column AA, charts two per band
+        chart_slots=tuple((26 + chart_num * 3, (chart_num // 2) * 18 + 1, (chart_num % 2) * 8)
+                          for chart_num in range(len(dimensions)))
+    )
+    # Keyed by identity, so keep the section alive alongside its layout;
+    # a process normally only ever sees one or two questionnaires
+    if len(_section_layouts) >= 16:
+        _section_layouts.clear()
+    _section_layouts[id(dimensions)] = (dimensions, layout)
+    return layout
+
+REPORT_PROFILES = ('compact', 'standard', 'full')
+
+def create_excel_report(client_name, cognitive_responses, cognitive_dimensions, 
+                       conative_responses, conative_dimensions,
+                       semantic_responses, semantic_dimensions,
+                       emotional_responses, emotional_dimensions, results=None,
+                       streaming=False, progress=None, report_profile='full'):
+    """Build the complete workbook.
+
+    ``results`` is an optional (cognitive, conative, semantic, emotional)
+    tuple of already aggregated results; when omitted they are calculated
+    from the responses.
+
+    By default the workbook is built in memory and returned as a BytesIO.
+    With ``streaming=True`` rows are flushed as they are written
+    (constant_memory) and the file is assembled in an anonymous temporary
+    file, which is returned open and rewound; the caller should close it.
+
+    ``progress(sheets_written, total_sheets)`` is called after each sheet.
+
+    ``report_profile`` picks how much is written:
+
+    - ``'full'``: Summary with one chart of all dimensions, a charts page
+      per section, Personal Profile, a sheet per dimension with its own
+      chart, and Info
+    - ``'standard'``: the same sheets, without the per-dimension charts
+    - ``'compact'``: Summary with one chart per section, Personal Profile
+      and Info
+
+    Measured with benchmarks/bench_report_profiles.py, all 60 dimensions
+    answered (in memory / streaming):
+
+    ========  =======  ======  ==============  ==============
+    profile   sheets   charts  file size       build time
+    ========  =======  ======  ==============  ==============
+    full      67       121     259 / 265 KB    0.15 / 0.50 s
+    standard  67       61      132 / 139 KB    0.11 / 0.37 s
+    compact   3        4       18 / 18 KB      0.015 / 0.040 s
+    ========  =======  ======  ==============  ==============
+    """
+    if report_profile not in REPORT_PROFILES:
+        raise ValueError(f"unknown report profile {report_profile!r}")
+    compact = report_profile == 'compact'
+    
+    if streaming:
+        buffer = tempfile.TemporaryFile(suffix='.xlsx')
+    else:
+        buffer = io.BytesIO()
+    
+    # Calculate results for all sections
+    if results is None:
+        results = (calculate_results(cognitive_responses, cognitive_dimensions),
+                   calculate_results(conative_responses, conative_dimensions),
+                   calculate_results(semantic_responses, semantic_dimensions),
+                   calculate_results(emotional_responses, emotional_dimensions))
+    cognitive_results, conative_results, semantic_results, emotional_results = results
+    
+    section_responses = [(cognitive_responses, cognitive_dimensions), (conative_responses, conative_dimensions),
+                         (semantic_responses, semantic_dimensions), (emotional_responses, emotional_dimensions)]
+    total_sheets = 3
+    if not compact:
+        total_sheets += sum(1 for section_results in results if section_results) + sum(
+            1 for responses, dimensions in section_responses
+            for dim_idx in range(len(dimensions)) if dim_idx in responses)
+    
+    def sheet_written():
+        if progress is not None:
+            progress(len(workbook.worksheets()), total_sheets)
+    
+    # Create workbook
+    # In memory, parts are assembled in StringIO rather than one temporary
+    # file each, which is most of the packaging time for 120+ charts
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': streaming, 'in_memory': not streaming})
+    
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#4CAF50',
+        'font_color': 'white',
+        'border': 1
+    })
+    
+    text_wrap_format = workbook.add_format({
+        'text_wrap': True,
+        'valign': 'top'
+    })
+    
+    # 1. SUMMARY SHEET
+    worksheet = workbook.add_worksheet('Summary')
+    worksheet.set_column('A:A', 60)
+    worksheet.set_column('B:B', 35)
+    worksheet.set_column('C:C', 15)
+    worksheet.set_column('D:D', 18)
+    
+    headers = ['Dimension', 'Dominant Type', 'Strength (%)', 'Total Questions']
+    for col, header in enumerate(headers):
+        worksheet.write(1, col, header, header_format)
+    
+    current_row = 2
+    data_start_row = current_row
+    
+    for dim_name, result in cognitive_results.items():
+        worksheet.write(current_row, 0, dim_name)
+        worksheet.write(current_row, 1, result['dominant_type'])
+        worksheet.write(current_row, 2, result['percentage'])
+        worksheet.write(current_row, 3, result['total_questions'])
+        current_row += 1
+    
+    for dim_name, result in conative_results.items():
+        worksheet.write(current_row, 0, dim_name)
+        worksheet.write(current_row, 1, result['dominant_type'])
+        worksheet.write(current_row, 2, result['percentage'])
+        worksheet.write(current_row, 3, result['total_questions'])
+        current_row += 1
+    
+    for dim_name, result in semantic_results.items():
+        worksheet.write(current_row, 0, dim_name)
+        worksheet.write(current_row, 1, result['dominant_type'])
+        worksheet.write(current_row, 2, result['percentage'])
+        worksheet.write(current_row, 3, result['total_questions'])
+        current_row += 1
+    
+    for dim_name, result in emotional_results.items():
+        worksheet.write(current_row, 0, dim_name)
+        worksheet.write(current_row, 1, result['dominant_type'])
+        worksheet.write(current_row, 2, result['percentage'])
+        worksheet.write(current_row, 3, result['total_questions'])
+        current_row += 1
+    
+    data_end_row = current_row - 1
+    
+    if compact:
+        # One chart per section, drawn from that section's rows of the table
+        section_start_row = data_start_row
+        chart_row = 1
+        for section_name, section_results in zip(('Cognitive', 'Conative', 'Semantic', 'Emotional'), results):
+            if not section_results:
+                continue
+            section_end_row = section_start_row + len(section_results) - 1
+            chart = workbook.add_chart({'type': 'bar'})
+            chart.add_series({
+                'name': 'Strength (%)',
+                'categories': ['Summary', section_start_row, 0, section_end_row, 0],
+                'values': ['Summary', section_start_row, 2, section_end_row, 2],
+                'categories_data': list(section_results),
+                'values_data': _cached_numbers(result['percentage'] for result in section_results.values()),
+                'fill': {'color': '#4CAF50'},
+                'data_labels': {'value': True}
+            })
+            chart.set_title({'name': f'{section_name} - Strength by Dimension'})
+            chart.set_x_axis({'name': 'Strength (%)', 'min': 0, 'max': 100})
+            chart.set_y_axis({'name': 'Dimension'})
+            chart_height = max(300, len(section_results) * 20 + 100)
+            chart.set_size({'width': 720, 'height': chart_height})
+            chart.set_legend({'position': 'none'})
+            worksheet.insert_chart(chart_row, 5, chart)
+            # Default rows are 20 pixels high; leave a row between charts
+            chart_row += chart_height // 20 + 1
+            section_start_row = section_end_row + 1
+    elif data_end_row >= data_start_row:
+        all_results = [result for section_results in results for result in section_results.items()]
+        chart = workbook.add_chart({'type': 'bar'})
+        chart.add_series({
+            'name': 'Strength (%)',
+            'categories': ['Summary', data_start_row, 0, data_end_row, 0],
+            'values': ['Summary', data_start_row, 2, data_end_row, 2],
+            # Cached chart data is passed explicitly because constant_memory
+            # worksheets cannot be read back once their rows are flushed
+            'categories_data': [dim_name for dim_name, result in all_results],
+            'values_data': _cached_numbers(result['percentage'] for dim_name, result in all_results),
+            'fill': {'color': '#4CAF50'},
+            'data_labels': {'value': True}
+        })
+        chart.set_title({'name': 'All Dimensions - Complete Profile'})
+        chart.set_x_axis({'name': 'Strength (%)', 'min': 0, 'max': 100})
+        chart.set_y_axis({'name': 'Dimension'})
+        
+        num_dimensions = len(cognitive_results) + len(conative_results) + len(semantic_results) + len(emotional_results)
+        chart_height = max(600, num_dimensions * 20)
+        chart.set_size({'width': 720, 'height': chart_height})
+        chart.set_legend({'position': 'none'})
+        worksheet.insert_chart(1, 5, chart)
+    sheet_written()
+    
+    # 2. ACCUMULATED CHARTS PAGES (right after Summary)
+    # (compact reports only have the section charts on the Summary sheet)
+    if not compact:
+        if cognitive_results:
+            _create_charts_page(workbook, cognitive_results, report_layout(cognitive_dimensions), 'Cognitive Charts', header_format)
+            sheet_written()
+        if conative_results:
+            _create_charts_page(workbook, conative_results, report_layout(conative_dimensions), 'Conative Charts', header_format)
+            sheet_written()
+        if semantic_results:
+            _create_charts_page(workbook, semantic_results, report_layout(semantic_dimensions), 'Semantic Charts', header_format)
+            sheet_written()
+        if emotional_results:
+            _create_charts_page(workbook, emotional_results, report_layout(emotional_dimensions), 'Emotional Charts', header_format)
+            sheet_written()
+    
+    # 3. PERSONAL PROFILE (after accumulated charts)
+    profile_text = generate_personal_profile(cognitive_results, conative_results, 
+                                            semantic_results, emotional_results)
+    
+    profile_ws = workbook.add_worksheet('Personal Profile')
+    profile_ws.set_column('A:A', 120)
+    
+    # Title
+    title_format = workbook.add_format({
+        'bold': True,
+        'font_size': 16,
+        'bg_color': '#2196F3',
+        'font_color': 'white',
+        'align': 'center'
+    })
+    profile_ws.merge_range('A1:A2', f'PERSONAL PROFILE - {client_name}', title_format)
+    
+    # Profile content
+    profile_ws.write(3, 0, profile_text, text_wrap_format)
+    sheet_written()
+    
+    # 4. INDIVIDUAL DIMENSION SHEETS
+    if not compact:
+        with_charts = report_profile == 'full'
+        _process_dimension_sheets(workbook, cognitive_responses, report_layout(cognitive_dimensions), cognitive_results, header_format, sheet_written, with_charts)
+        _process_dimension_sheets(workbook, conative_responses, report_layout(conative_dimensions), conative_results, header_format, sheet_written, with_charts)
+        _process_dimension_sheets(workbook, semantic_responses, report_layout(semantic_dimensions), semantic_results, header_format, sheet_written, with_charts)
+        _process_dimension_sheets(workbook, emotional_responses, report_layout(emotional_dimensions), emotional_results, header_format, sheet_written, with_charts)
+    
+    # 5. INFO SHEET
+    info_ws = workbook.add_worksheet('Info')
+    info_ws.set_column('A:A', 30)
+    info_ws.set_column('B:B', 40)
+    
+    info_data = [
+        ['Field', 'Value'],
+        ['Client Name', client_name],
+        ['Assessment Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+        ['Cognitive Dimensions', len(cognitive_results)],
+        ['Cognitive Questions', sum(r['total_questions'] for r in cognitive_results.values()) if cognitive_results else 0],
+        ['Conative Dimensions', len(conative_results)],
+        ['Conative Questions', sum(r['total_questions'] for r in conative_results.values()) if conative_results else 0],
+        ['Semantic Dimensions', len(semantic_results)],
+        ['Semantic Questions', sum(r['total_questions'] for r in semantic_results.values()) if semantic_results else 0],
+        ['Emotional Dimensions', len(emotional_results)],
+        ['Emotional Questions', sum(r['total_questions'] for r in emotional_results.values()) if emotional_results else 0],
+        ['Total Dimensions', len(cognitive_results) + len(conative_results) + len(semantic_results) + len(emotional_results)],
+        ['Total Questions', sum([
+            sum(r['total_questions'] for r in cognitive_results.values()) if cognitive_results else 0,
+            sum(r['total_questions'] for r in conative_results.values()) if conative_results else 0,
+            sum(r['total_questions'] for r in semantic_results.values()) if semantic_results else 0,
+            sum(r['total_questions'] for r in emotional_results.values()) if emotional_results else 0
+        ])]
+    ]
+    
+    for row_idx, row_data in enumerate(info_data):
+        for col_idx, value in enumerate(row_data):
+            if row_idx == 0:
+                info_ws.write(row_idx, col_idx, value, header_format)
+            else:
+                info_ws.write(row_idx, col_idx, value)
+    
+    sheet_written()
+    
+    workbook.close()
+    buffer.seek(0)
+    return buffer
+
+def _create_charts_page(workbook, results, layout, sheet_name, header_format):
+    """Create accumulated charts page"""
+    worksheet = workbook.add_worksheet(sheet_name)
+    
+    charted = []
+    for dimension in layout.dimensions:
+        result = results.get(dimension.name)
+        if result is not None:
+            percentages = [(type_name, (count / result['total_questions']) * 100)
+                           for type_name, count in result['all_scores'].items()]
+            charted.append((dimension, percentages, layout.chart_slots[len(charted)]))
+    
+    # Chart data sits side by side from column AA on; write it across all
+    # dimensions one row at a time
+    for dimension, percentages, (data_col, chart_row, chart_col) in charted:
+        worksheet.write_string(1, data_col, 'Type', header_format)
+        worksheet.write_string(1, data_col + 1, 'Percentage', header_format)
+    
+    max_types = max((len(percentages) for dimension, percentages, slot in charted), default=0)
+    for offset in range(max_types):
+        for dimension, percentages, (data_col, chart_row, chart_col) in charted:
+            if offset < len(percentages):
+                type_name, percentage = percentages[offset]
+                worksheet.write_string(2 + offset, data_col, type_name)
+                worksheet.write_number(2 + offset, data_col + 1, percentage)
+    
+    for dimension, percentages, (data_col, chart_row, chart_col) in charted:
+        data_row = 2 + len(percentages)
+        
+        chart = workbook.add_chart({'type': 'bar'})
+        chart.add_series({
+            'name': 'Percentage',
+            'categories': [sheet_name, 2, data_col, data_row - 1, data_col],
+            'values': [sheet_name, 2, data_col + 1, data_row - 1, data_col + 1],
+            'categories_data': [type_name for type_name, percentage in percentages],
+            'values_data': _cached_numbers(percentage for type_name, percentage in percentages),
+            'fill': {'color': '#2196F3'},
+            'data_labels': {'value': True}
+        })
+        chart.set_title({'name': dimension.clean_name})
+        chart.set_x_axis({'name': 'Percentage (%)', 'min': 0, 'max': 100})
+        chart.set_y_axis({'name': 'Type'})
+        chart.set_size({'width': 480, 'height': 300})
+        chart.set_legend({'position': 'none'})
+        worksheet.insert_chart(chart_row, chart_col, chart)
+
+def _process_dimension_sheets(workbook, responses, layout, results, header_format, on_sheet=None,
+                              with_charts=True):
+    """Create individual dimension sheets"""
+    for dim_idx, dimension in enumerate(layout.dimensions):
+        if dim_idx not in responses:
+            continue
+        
+        sheet_name = dimension.sheet_name
+        answers = responses[dim_idx]
+        
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.set_column(0, 0, 12)
+        worksheet.set_column(1, 2, 60)
+        
+        worksheet.write_string(1, 0, 'Question #', header_format)
+        worksheet.write_string(1, 1, 'Question', header_format)
+        worksheet.write_string(1, 2, 'Answer', header_format)
+        
+        row_idx = 2
+        for question in dimension.questions:
+            answer_key = answers.get(question.number)
+            answer_cell = question.answer_cells.get(answer_key)
+            if answer_cell is None:
+                answer_cell = _answer_cell(question, answer_key)
+            
+            worksheet.write_number(row_idx, 0, question.number)
+            worksheet.write(row_idx, 1, question.text)
+            worksheet.write(row_idx, 2, answer_cell)
+            row_idx += 1
+        
+        result = results.get(dimension.name)
+        if result is not None:
+            chart_start_row = row_idx + 3
+            worksheet.write_string(chart_start_row, 0, 'Type', header_format)
+            worksheet.write_string(chart_start_row, 1, 'Count', header_format)
+            worksheet.write_string(chart_start_row, 2, 'Percentage', header_format)
+            
+            chart_data_row = chart_start_row + 1
+            percentages = []
+            for type_name, count in result['all_scores'].items():
+                percentage = (count / result['total_questions']) * 100
+                worksheet.write_string(chart_data_row, 0, type_name)
+                worksheet.write_number(chart_data_row, 1, count)
+                worksheet.write_number(chart_data_row, 2, percentage)
+                percentages.append(percentage)
+                chart_data_row += 1
+            
+            if with_charts:
+                chart = workbook.add_chart({'type': 'bar'})
+                chart.add_series({
+                    'name': 'Percentage',
+                    'categories': [sheet_name, chart_start_row + 1, 0, chart_data_row - 1, 0],
+                    'values': [sheet_name, chart_start_row + 1, 2, chart_data_row - 1, 2],
+                    'categories_data': list(result['all_scores']),
+                    'values_data': _cached_numbers(percentages),
+                    'fill': {'color': '#2196F3'},
+                    'data_labels': {'value': True}
+                })
+                chart.set_title({'name': dimension.chart_title})
+                chart.set_x_axis({'name': 'Percentage (%)', 'min': 0, 'max': 100})
+                chart.set_y_axis({'name': 'Type'})
+                chart.set_size({'width': 480, 'height': 300})
+                chart.set_legend({'position': 'none'})
+                worksheet.insert_chart(chart_start_row, 4, chart)
+        
+        if on_sheet is not None:
+            on_sheet()
+
+def create_cohort_report(respondents, questionnaire, output=None, chunk_size=2000, on_scores=None):
+    """Build one workbook summarising a cohort of respondents.
+
+    ``respondents`` yields (respondent_id, client_name, section_responses)
+    with section_responses mapping section keys to responses dicts. It is
+    consumed lazily in chunks of ``chunk_size``: each chunk is scored with
+    batch_scoring and its rows are flushed straight away (constant_memory),
+    so memory does not grow with the size of the cohort.
+
+    Writes to ``output`` (a path or binary file) when given, otherwise to an
+    anonymous temporary file that is returned open and rewound.
+    ``on_scores(section_key, dim_idx, dim_scores)`` is called with the
+    batch_scoring result of every dimension of every chunk.
+    """
+    # Imported here so single reports do not pay for loading numpy
+    import numpy as np
+    from batch_scoring import encode_responses, score_batch
+
+    buffer = tempfile.TemporaryFile(suffix='.xlsx') if output is None else output
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+    
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#4CAF50',
+        'font_color': 'white',
+        'border': 1
+    })
+    dimension_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#4CAF50',
+        'font_color': 'white',
+        'border': 1,
+        'align': 'center'
+    })
+    strength_format = workbook.add_format({'num_format': '0.0'})
+    
+    sections = [(section_key, questionnaire.sections[section_key]) for section_key, filename in ASSESSMENT_FILES]
+    
+    # Sheets appear in creation order; the summary is filled in at the end
+    summary_ws = workbook.add_worksheet('Cohort Summary')
+    worksheet = workbook.add_worksheet('Respondents')
+    worksheet.set_column(0, 0, 12)
+    worksheet.set_column(1, 1, 30)
+    worksheet.freeze_panes(2, 2)
+    
+    # 1. RESPONDENTS: one row per respondent, Type / Strength per dimension
+    worksheet.write(1, 0, 'ID', header_format)
+    worksheet.write(1, 1, 'Client Name', header_format)
+    col = 2
+    for section_key, dimensions in sections:
+        for dimension in dimensions:
+            worksheet.merge_range(0, col, 0, col + 1, dimension.clean_name, dimension_format)
+            col += 2
+    worksheet.set_column(2, col - 1, 14)
+    col = 2
+    for section_key, dimensions in sections:
+        for dimension in dimensions:
+            worksheet.write(1, col, 'Type', header_format)
+            worksheet.write(1, col + 1, 'Strength (%)', header_format)
+            col += 2
+    
+    type_counts = [[np.zeros(len(dimension.answer_key.types), dtype=np.int64) for dimension in dimensions]
+                   for section_key, dimensions in sections]
+    strength_totals = [[0.0] * len(dimensions) for section_key, dimensions in sections]
+    
+    row_idx = 2
+    respondents = iter(respondents)
+    while True:
+        chunk = list(itertools.islice(respondents, chunk_size))
+        if not chunk:
+            break
+        
+        row_columns = []
+        for section_idx, (section_key, dimensions) in enumerate(sections):
+            codes = encode_responses([section_responses.get(section_key, {})
+                                      for respondent_id, client_name, section_responses in chunk], dimensions)
+            for dim_idx, dim_scores in enumerate(score_batch(codes, dimensions)):
+                if on_scores is not None:
+                    on_scores(section_key, dim_idx, dim_scores)
+                answered = dim_scores.dominant >= 0
+                type_counts[section_idx][dim_idx] += np.bincount(
+                    dim_scores.dominant[answered], minlength=len(dim_scores.types))
+                strength_totals[section_idx][dim_idx] += float(dim_scores.percentages[answered].sum())
+                row_columns.append((dim_scores.types, dim_scores.dominant.tolist(),
+                                    dim_scores.percentages.tolist()))
+        
+        for offset, (respondent_id, client_name, section_responses) in enumerate(chunk):
+            worksheet.write(row_idx, 0, respondent_id)
+            worksheet.write(row_idx, 1, client_name)
+            col = 2
+            for types, dominant, percentages in row_columns:
+                if dominant[offset] >= 0:
+                    worksheet.write_string(row_idx, col, types[dominant[offset]])
+                    worksheet.write_number(row_idx, col + 1, percentages[offset], strength_format)
+                col += 2
+            row_idx += 1
+    respondent_count = row_idx - 2
+    
+    # Type distributions per dimension, shaped like calculate_results so
+    # the charts pages can be drawn the same way as in a single report
+    distributions = []
+    for section_idx, (section_key, dimensions) in enumerate(sections):
+        section_distribution = {}
+        for dim_idx, dimension in enumerate(dimensions):
+            counts = type_counts[section_idx][dim_idx].tolist()
+            answered = sum(counts)
+            if answered:
+                section_distribution[dimension.name] = {
+                    'all_scores': dict(zip(dimension.answer_key.types, counts)),
+                    'total_questions': answered,
+                    'mean_strength': strength_totals[section_idx][dim_idx] / answered
+                }
+        distributions.append(section_distribution)
+    
+    # 2. COHORT SUMMARY
+    summary_ws.set_column('A:A', 60)
+    summary_ws.set_column('B:B', 35)
+    summary_ws.set_column('C:E', 18)
+    
+    headers = ['Dimension', 'Most Common Type', 'Share (%)', 'Mean Strength (%)', 'Respondents']
+    for col, header in enumerate(headers):
+        summary_ws.write(1, col, header, header_format)
+    
+    current_row = 2
+    for section_distribution in distributions:
+        for dim_name, distribution in section_distribution.items():
+            all_scores = distribution['all_scores']
+            most_common = max(all_scores, key=all_scores.get)
+            summary_ws.write(current_row, 0, dim_name)
+            summary_ws.write(current_row, 1, most_common)
+            summary_ws.write(current_row, 2, all_scores[most_common] / distribution['total_questions'] * 100,
+                             strength_format)
+            summary_ws.write(current_row, 3, distribution['mean_strength'], strength_format)
+            summary_ws.write(current_row, 4, distribution['total_questions'])
+            current_row += 1
+    
+    # 3. DISTRIBUTION CHARTS: share of respondents with each dominant type
+    for (section_key, dimensions), section_distribution in zip(sections, distributions):
+        if section_distribution:
+            _create_charts_page(workbook, section_distribution, report_layout(dimensions),
+                                f'{section_key.capitalize()} Charts', header_format)
+    
+    # 4. INFO SHEET
+    info_ws = workbook.add_worksheet('Info')
+    info_ws.set_column('A:A', 30)
+    info_ws.set_column('B:B', 40)
+    
+    info_data = [
+        ['Field', 'Value'],
+        ['Respondents', respondent_count],
+        ['Report Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+        ['Questionnaire Version', questionnaire.version]
+    ]
+    for row_idx, row_data in enumerate(info_data):
+        for col_idx, value in enumerate(row_data):
+            if row_idx == 0:
+                info_ws.write(row_idx, col_idx, value, header_format)
+            else:
+                info_ws.write(row_idx, col_idx, value)
+    
+    workbook.close()
+    if output is None:
+        buffer.seek(0)
+        return buffer
+    return output
@@ -0,0 +1,283 @@
+"""Optional AI narrative: expand the personal profile into flowing prose.
+
+The narrative depends only on the profile text, which depends only on the
+respondent's trait signature (assessment_core.profile_signature), so
+completions are cached under (prompt version, rules version, backend,
+signature). Requests run on asyncio under a concurrency limit, and a
+signature that is already being generated is awaited rather than asked
+for again, so a batch never sends the same prompt twice.
+
+Backends stream text chunks. OpenAIBackend uses the optional openai
+package; StubBackend is a deterministic local stand-in for offline use
+and tests. NLP_NARRATIVE_BACKEND picks one ('openai' or 'stub'); without
+it the OpenAI backend is used when OPENAI_API_KEY is set.
+
+    python narrative.py responses.jsonl -o narratives.jsonl --backend stub
+"""
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import queue
+import re
+import sys
+import threading
+
+from assessment_core import load_profile_rules, profile_signature
+from report_cache import ReportCache
+
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = (
+    "You are an NLP practitioner writing a client's assessment feedback. "
+    "Rewrite the profile you are given as a warm, second-person narrative of "
+    "four to six short paragraphs. Keep every statement from the profile, do "
+    "not invent new traits, and do not use headings or bullet points."
+)
+
+
+def build_prompt(profile_text):
+    return f"Personal profile:\n\n{profile_text}"
+
+
+class StubBackend:
+    """Deterministic offline backend: turns each profile section into a paragraph"""
+    name = 'stub'
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    @staticmethod
+    def compose(prompt):
+        paragraphs = []
+        for block in prompt.split('\n\n\n'):
+            lines = [line.strip() for line in block.splitlines() if line.strip()]
+            lines = [line for line in lines if line != 'Personal profile:']
+            if not lines:
+                continue
+            title = lines[0].rstrip(':').capitalize() if lines[0].endswith(':') else None
+            sentences = []
+            for line in lines[1:] if title else lines:
+                if line.endswith(':'):
+                    continue
+                line = line.lstrip('- ')
+                sentences.append(line if line.endswith('.') else line + '.')
+            if sentences:
+                paragraphs.append((f"{title}. " if title else '') + ' '.join(sentences))
+        return '\n\n'.join(paragraphs)
+
+    async def stream(self, prompt):
+        for chunk in re.findall(r'\S+\s*', self.compose(prompt)):
+            # Yield control per token, as a network stream would
+            await asyncio.sleep(self.delay)
+            yield chunk
+
+
+class OpenAIBackend:
+    def __init__(self, model=None, client=None):
+        self.model = model or os.environ.get('NLP_NARRATIVE_MODEL', 'gpt-4o-mini')
+        if client is None:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI()
+        self.client = client
+        self.name = f'openai:{self.model}'
+
+    async def stream(self, prompt):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{'role': 'system', 'content': SYSTEM_PROMPT},
+                      {'role': 'user', 'content': prompt}],
+            stream=True,
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+def make_backend(name=None):
+    """Backend named by name or NLP_NARRATIVE_BACKEND, or None when narratives are off"""
+    name = name or os.environ.get('NLP_NARRATIVE_BACKEND')
+    if name is None and os.environ.get('OPENAI_API_KEY') and importlib.util.find_spec('openai'):
+        name = 'openai'
+    if name == 'stub':
+        return StubBackend()
+    if name == 'openai':
+        return OpenAIBackend()
+    if name:
+        raise ValueError(f"unknown narrative backend {name!r}")
+    return None
+
+
+class NarrativeGenerator:
+    """Cached, deduplicated, concurrency-limited narratives for one backend.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, backend, cache, concurrency=4):
+        self.backend = backend
+        self.cache = cache
+        self.concurrency = concurrency
+        self.requests = 0
+        self._inflight = {}
+        self._semaphore = None
+
+    def key(self, signature):
+        digest = hashlib.sha256(f"{PROMPT_VERSION}\0{load_profile_rules().version}\0{self.backend.name}".encode())
+        for value in signature:
+            digest.update(b'\0' + value.encode('utf-8'))
+        return digest.hexdigest()
+
+    def cached(self, signature):
+        """Finished narrative for signature, or None"""
+        data = self.cache.get(self.key(signature))
+        return data.decode('utf-8') if data is not None else None
+
+    async def stream(self, signature, profile_text):
+        """Yield the narrative in chunks, from the cache when possible"""
+        key = self.key(signature)
+        data = self.cache.get(key)
+        if data is not None:
+            yield data.decode('utf-8')
+            return
+        pending = self._inflight.get(key)
+        if pending is not None:
+            yield await asyncio.shield(pending)
+            return
+
+        # Registered before the first await, so concurrent callers with the
+        # same signature always find it
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        chunks = []
+        try:
+            async with self._semaphore:
+                self.requests += 1
+                async for chunk in self.backend.stream(build_prompt(profile_text)):
+                    chunks.append(chunk)
+                    yield chunk
+            text = ''.join(chunks)
+            self.cache.put(key, text.encode('utf-8'))
+            future.set_result(text)
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("narrative cancelled"))
+            # Nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def generate(self, signature, profile_text):
+        return ''.join([chunk async for chunk in self.stream(signature, profile_text)])
+
+    async def generate_many(self, items):
+        """Narratives for (signature, profile_text) pairs, in order"""
+        return await asyncio.gather(*(self.generate(signature, profile_text)
+                                      for signature, profile_text in items))
+
+
+_DONE = object()
+
+
+class NarrativeService:
+    """Runs a NarrativeGenerator on its own event loop thread for synchronous callers"""
+
+    def __init__(self, generator):
+        self.generator = generator
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name='narrative-loop', daemon=True).start()
+
+    def cached(self, signature):
+        return self.generator.cached(signature)
+
+    def stream(self, signature, profile_text):
+        """Blocking iterator over narrative chunks, e.g. for st.write_stream"""
+        chunks = queue.Queue()
+
+        async def pump():
+            try:
+                async for chunk in self.generator.stream(signature, profile_text):
+                    chunks.put(chunk)
+                chunks.put(_DONE)
+            except Exception as e:
+                chunks.put(e)
+
+        # The generation finishes and is cached even if the caller stops
+        # reading early
+        asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+async def _run_batch(records, output_stream, generator, chunk_size):
+    from bulk_score import chunked, score_chunk
+
+    count = 0
+    for chunk in chunked(records, chunk_size):
+        scored = score_chunk(chunk)
+        items = []
+        for output in scored:
+            if 'results' in output:
+                results = [output['results'][section_key]
+                           for section_key in ('cognitive', 'conative', 'semantic', 'emotional')]
+                items.append((profile_signature(*results), output['profile']))
+        narratives = iter(await generator.generate_many(items))
+        for output in scored:
+            line = {'id': output['id'], 'client_name': output['client_name']}
+            if 'results' in output:
+                line['narrative'] = next(narratives)
+            else:
+                line['error'] = output['error']
+            output_stream.write(json.dumps(line, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def main(argv=None):
+    from bulk_score import read_records, detect_format
+
+    parser = argparse.ArgumentParser(description="Generate narratives for scored respondents.")
+    parser.add_argument('input', help="JSONL or CSV file of responses (bulk_score format), or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file (default: stdout)")
+    parser.add_argument('--input-format', choices=['jsonl', 'csv'])
+    parser.add_argument('--backend', choices=['openai', 'stub'])
+    parser.add_argument('--concurrency', type=int,
+                        default=int(os.environ.get('NLP_NARRATIVE_CONCURRENCY', '4')),
+                        help="requests in flight at once (default: 4)")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    backend = make_backend(args.backend)
+    if backend is None:
+        parser.error("no narrative backend: pass --backend or set NLP_NARRATIVE_BACKEND / OPENAI_API_KEY")
+    # Every distinct narrative is kept for the whole run, so a signature
+    # seen earlier is never sent again however far apart the duplicates are
+    generator = NarrativeGenerator(backend, ReportCache(max_entries=sys.maxsize, suffix='.txt'),
+                                   concurrency=max(1, args.concurrency))
+
+    input_format = detect_format(args.input, args.input_format)
+    input_stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        count = asyncio.run(_run_batch(read_records(input_stream, input_format), output_stream,
+                                       generator, max(1, args.chunk_size)))
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(f"Wrote {count} narratives with {generator.requests} requests", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
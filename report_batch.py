@@ -0,0 +1,248 @@
+"""Build one Excel report per respondent and stream them into a ZIP archive.
+
+Input records use the same JSONL / CSV fields as bulk_score.py. Workbooks
+are built across a process pool and each one is written into the archive
+as soon as it is ready, so only a bounded number of reports is ever held in
+memory.
+
+Progress is journalled next to the archive (<archive>.journal) after every
+report. If a run is interrupted, running the same command again truncates
+the archive back to the last journalled report, rebuilds its directory and
+carries on with the respondents that are still missing. Re-running against
+a finished archive only adds respondents that are not in it yet; its
+existing members and the offset of its old directory are journalled
+before anything is added, so resuming such a run never loses them.
+
+Reports use the compact profile unless --profile says otherwise (see
+create_excel_report for what each profile contains).
+
+    python report_batch.py cohort.jsonl -o reports.zip --workers 4
+    python report_batch.py cohort.jsonl -o reports.zip --profile full
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from assessment_core import ASSESSMENT_FILES, process_questionnaire
+from bulk_score import read_records, decode_section, bounded_map, detect_format
+from excel_report import REPORT_PROFILES
+from report_jobs import build_report_bytes
+
+SECTION_KEYS = [section_key for section_key, filename in ASSESSMENT_FILES]
+
+
+def report_name(record, number):
+    """Archive member name for one respondent"""
+    label = str(record['id'] if record.get('id') is not None else number)
+    client_name = record.get('client_name')
+    if client_name:
+        label += '_' + str(client_name)
+    return re.sub(r'[^\w.-]+', '_', label) + '.xlsx'
+
+
+def build_record_report(task):
+    """(name, workbook bytes, error) for one (name, record, report profile) task"""
+    name, record, report_profile = task
+    questionnaire = process_questionnaire()
+    try:
+        section_responses = {
+            section_key: decode_section(record.get(section_key), questionnaire.sections[section_key])
+            for section_key in SECTION_KEYS
+        }
+        return name, build_report_bytes(record.get('client_name', ''), section_responses,
+                                        report_profile=report_profile), None
+    except (ValueError, TypeError, AttributeError, KeyError) as e:
+        return name, None, str(e)
+
+
+def _read_journal(journal_path):
+    """(offset the archive may be cut back to, journalled members)"""
+    start = 0
+    entries = []
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A torn last line means that report was not finished
+                break
+            if 'start_dir' in entry:
+                start = entry['start_dir']
+            else:
+                entries.append(entry)
+    return start, entries
+
+
+def _journal_entry(info, end):
+    return {
+        'name': info.filename, 'date_time': info.date_time, 'crc': info.CRC,
+        'size': info.file_size, 'compress_size': info.compress_size,
+        'compress_type': info.compress_type, 'flag_bits': info.flag_bits,
+        'offset': info.header_offset, 'end': end,
+    }
+
+
+def _journal_info(entry):
+    info = zipfile.ZipInfo(entry['name'], tuple(entry['date_time']))
+    info.compress_type = entry.get('compress_type', zipfile.ZIP_STORED)
+    info.flag_bits = entry.get('flag_bits', 0)
+    info.external_attr = 0o644 << 16
+    info.CRC = entry['crc']
+    info.file_size = entry['size']
+    info.compress_size = entry.get('compress_size', entry['size'])
+    info.header_offset = entry['offset']
+    return info
+
+
+def _seed_journal(archive, journal_path):
+    # Appending overwrites the old directory, so the members it listed are
+    # journalled first; resuming rebuilds the directory from them and never
+    # cuts the file before the offset the new members start at
+    lines = [{'start_dir': archive.start_dir}]
+    lines += [_journal_entry(info, archive.start_dir) for info in archive.infolist()]
+    temp_path = journal_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(line) + '\n' for line in lines)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, journal_path)
+
+
+def open_archive(path, journal_path):
+    """Open path for appending, recovering an interrupted run from its journal"""
+    if os.path.exists(journal_path):
+        start, entries = _read_journal(journal_path)
+        end = max(start, entries[-1]['end']) if entries else start
+        fp = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        fp.truncate(end)
+        fp.seek(end)
+        # Mode 'w' on an already positioned file starts the directory here
+        # without truncating; the journalled members are added back to it
+        archive = zipfile.ZipFile(fp, 'w')
+        for entry in entries:
+            info = _journal_info(entry)
+            archive.filelist.append(info)
+            archive.NameToInfo[info.filename] = info
+        return archive
+    if os.path.exists(path):
+        archive = zipfile.ZipFile(path, 'a')
+        _seed_journal(archive, journal_path)
+        return archive
+    return zipfile.ZipFile(path, 'w')
+
+
+def _pending_tasks(records, done, skipped, failures, report_profile, log=None):
+    def fail(name, error):
+        failures.append((name, error))
+        if log:
+            print(f"{name}: {error}", file=log)
+
+    done = set(done)
+    seen = set()
+    for number, raw in records:
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except json.JSONDecodeError as e:
+                fail(f"record {number}", f"invalid JSON: {e}")
+                continue
+        if not isinstance(raw, dict):
+            fail(f"record {number}", f"expected a JSON object, got {type(raw).__name__}")
+            continue
+        name = report_name(raw, number)
+        if name in seen:
+            # Two respondents of this input would overwrite each other
+            fail(f"record {number}", f"report name {name} is already used by another record")
+            continue
+        seen.add(name)
+        if name in done:
+            # Already in the archive from an earlier run
+            skipped.append(name)
+            continue
+        yield name, raw, report_profile
+
+
+def run(input_stream, input_format, archive_path, workers=1, log=None, report_profile='compact'):
+    """Write a report for every respondent of input_stream into archive_path.
+
+    Returns (reports written, reports already present, failures).
+    """
+    journal_path = archive_path + '.journal'
+    archive = open_archive(archive_path, journal_path)
+    journal = open(journal_path, 'a', encoding='utf-8')
+    skipped = []
+    failures = []
+    written = 0
+    try:
+        tasks = _pending_tasks(read_records(input_stream, input_format), archive.namelist(), skipped,
+                               failures, report_profile, log)
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            reports = bounded_map(executor, build_record_report, tasks, max_pending=workers * 2)
+        else:
+            executor = None
+            reports = map(build_record_report, tasks)
+
+        try:
+            for name, data, error in reports:
+                if error is not None:
+                    failures.append((name, error))
+                    if log:
+                        print(f"{name}: {error}", file=log)
+                    continue
+                info = zipfile.ZipInfo(name, time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_STORED
+                info.external_attr = 0o644 << 16
+                # Workbooks are already deflated, so they are stored as is
+                archive.writestr(info, data)
+                archive.fp.flush()
+                journal.write(json.dumps(_journal_entry(info, archive.fp.tell())) + '\n')
+                journal.flush()
+                written += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    finally:
+        journal.close()
+        fp = archive.fp
+        archive.close()
+        if fp is not None and not fp.closed:
+            fp.close()
+
+    # Only a cleanly closed archive has a directory of its own
+    os.remove(journal_path)
+    return written, len(skipped), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an Excel report per respondent into a ZIP archive.")
+    parser.add_argument('input', help="JSONL or CSV file of responses, or - for stdin")
+    parser.add_argument('-o', '--output', required=True, help="ZIP archive to create or resume")
+    parser.add_argument('--input-format', choices=['jsonl', 'csv'])
+    parser.add_argument('--workers', type=int, default=0,
+                        help="processes building reports (default: 0, all cores)")
+    parser.add_argument('--profile', choices=REPORT_PROFILES, default='compact',
+                        help="report profile (default: compact)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    input_format = detect_format(args.input, args.input_format)
+    input_stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    try:
+        written, skipped, failures = run(input_stream, input_format, args.output,
+                                         workers=workers, log=sys.stderr, report_profile=args.profile)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+
+    print(f"Wrote {written} reports ({skipped} already in the archive, {len(failures)} failed)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Bounded LRU cache of generated report bytes keyed by response fingerprint.
+
+The Streamlit app keeps one ReportCache per process so reruns of the results
+page, and other sessions with identical answers, reuse an already built
+workbook instead of exporting it again. Entries can optionally be mirrored
+to a directory so they survive restarts and are shared between processes.
+"""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class ReportCache:
+    def __init__(self, max_entries=32, cache_dir=None, max_disk_entries=256, suffix='.xlsx'):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, fingerprint):
+        return os.path.join(self.cache_dir, fingerprint + self.suffix)
+
+    def _remember(self, fingerprint, data):
+        self._entries[fingerprint] = data
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, fingerprint):
+        with self._lock:
+            if fingerprint in self._entries:
+                return True
+        return bool(self.cache_dir) and os.path.exists(self._path(fingerprint))
+
+    def get(self, fingerprint):
+        """Cached bytes for fingerprint, or None"""
+        with self._lock:
+            data = self._entries.get(fingerprint)
+            if data is not None:
+                self._entries.move_to_end(fingerprint)
+                self.hits += 1
+                return data
+
+        if self.cache_dir:
+            try:
+                with open(self._path(fingerprint), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self._remember(fingerprint, data)
+                    self.hits += 1
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, fingerprint, data):
+        with self._lock:
+            self._remember(fingerprint, data)
+        if self.cache_dir:
+            self._write_disk(fingerprint, data)
+
+    def _write_disk(self, fingerprint, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(fingerprint))
+            self._prune_disk()
+        except OSError:
+            pass
+
+    def _prune_disk(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.suffix):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        for mtime, path in entries[:max(0, len(entries) - self.max_disk_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
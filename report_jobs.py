@@ -0,0 +1,123 @@
+"""Background report generation on a local process pool.
+
+The Streamlit script thread only submits a job and polls its status; the
+workbook itself is built in a worker process, so CPU-heavy exports do not
+compete with interactive sessions for the interpreter. Jobs are keyed by
+response fingerprint: submitting a fingerprint that is already cached or
+still being built reuses that work instead of starting another build.
+"""
+import multiprocessing
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from assessment_core import ASSESSMENT_FILES, process_questionnaire
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+JobStatus = namedtuple('JobStatus', 'state sheets_written total_sheets error')
+
+
+def build_report_bytes(client_name, section_responses, progress=None, report_profile='full',
+                       streaming=False, section_results=None):
+    """Workbook bytes for one respondent, built in the calling process.
+
+    ``section_results`` maps section keys to already aggregated results;
+    when omitted they are calculated from the responses. Reports are built
+    in memory by default: each worker builds one at a time, so streaming
+    only makes the build slower.
+    """
+    # Imported here so xlsxwriter only loads where reports are built
+    from excel_report import create_excel_report
+    questionnaire = process_questionnaire()
+    args = []
+    for section_key, filename in ASSESSMENT_FILES:
+        args += [section_responses[section_key], questionnaire.sections[section_key]]
+    results = None
+    if section_results is not None:
+        results = tuple(section_results[section_key] for section_key, filename in ASSESSMENT_FILES)
+    excel_file = create_excel_report(client_name, *args, results=results, streaming=streaming,
+                                     progress=progress, report_profile=report_profile)
+    with excel_file:
+        return excel_file.read()
+
+
+def _run_job(fingerprint, client_name, section_responses, section_results, progress):
+    # Runs in a pool worker; progress is a manager dict shared with the app
+    def report_progress(sheets_written, total_sheets):
+        progress[fingerprint] = (sheets_written, total_sheets)
+    report_progress(0, 0)
+    return build_report_bytes(client_name, section_responses, report_progress,
+                              section_results=section_results)
+
+
+class ReportJobQueue:
+    def __init__(self, report_cache, max_workers=None):
+        self.report_cache = report_cache
+        # Spawned workers start clean instead of forking a process that is
+        # running Streamlit's server threads
+        context = multiprocessing.get_context('spawn')
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        self._manager = context.Manager()
+        self._progress = self._manager.dict()
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fingerprint, client_name, section_responses, section_results=None):
+        """Queue a build unless this fingerprint is cached or already in progress.
+
+        Pass the session's ``section_results`` so the worker does not score
+        the responses again.
+        """
+        with self._lock:
+            future = self._jobs.get(fingerprint)
+            if future is not None and not (future.done() and future.exception() is not None):
+                return
+            if fingerprint in self.report_cache:
+                return
+            future = self._executor.submit(
+                _run_job, fingerprint, client_name, section_responses, section_results, self._progress)
+            self._jobs[fingerprint] = future
+        future.add_done_callback(lambda f: self._finished(fingerprint, f))
+
+    def _finished(self, fingerprint, future):
+        self._progress.pop(fingerprint, None)
+        if future.cancelled() or future.exception() is not None:
+            # Failed jobs stay listed so status() can report the error
+            return
+        self.report_cache.put(fingerprint, future.result())
+        with self._lock:
+            if self._jobs.get(fingerprint) is future:
+                del self._jobs[fingerprint]
+
+    def status(self, fingerprint):
+        """JobStatus for fingerprint, or None if no job was submitted"""
+        with self._lock:
+            future = self._jobs.get(fingerprint)
+        if future is None:
+            return JobStatus(DONE, 0, 0, None) if fingerprint in self.report_cache else None
+        if future.done():
+            error = future.exception()
+            if error is not None:
+                return JobStatus(FAILED, 0, 0, str(error))
+            return JobStatus(DONE, 0, 0, None)
+        written, total = self._progress.get(fingerprint, (0, 0)) if future.running() else (0, 0)
+        return JobStatus(RUNNING if future.running() else QUEUED, written, total, None)
+
+    def result(self, fingerprint):
+        """Finished workbook bytes for fingerprint, or None"""
+        data = self.report_cache.get(fingerprint)
+        if data is not None:
+            return data
+        with self._lock:
+            future = self._jobs.get(fingerprint)
+        if future is not None and future.done() and future.exception() is None:
+            return future.result()
+        return None
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
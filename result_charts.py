@@ -0,0 +1,150 @@
+"""Plotly figure specs for scoring results.
+
+Figures are returned as plain dicts ({'data': [...], 'layout': {...}}), so
+they are cheap to cache and pickle and building them does not import
+plotly; only rendering them (st.plotly_chart, plotly.io) needs the
+optional plotly package. Cohort views can hold hundreds of thousands of
+points, so above WEBGL_THRESHOLD points they use WebGL (scattergl) traces.
+"""
+import importlib.util
+
+from assessment_core import ASSESSMENT_FILES, dimension_clean_name
+
+SECTION_TITLES = {
+    'cognitive': "Cognitive (Thinking)",
+    'conative': "Conative (Choosing)",
+    'semantic': "Semantic (Meta)",
+    'emotional': "Emotional (Feeling)",
+}
+SECTION_COLORS = {
+    'cognitive': '#4CAF50',
+    'conative': '#2196F3',
+    'semantic': '#9C27B0',
+    'emotional': '#F44336',
+}
+DOMINANT_COLOR = '#4CAF50'
+OTHER_COLOR = '#B0BEC5'
+
+WEBGL_THRESHOLD = 5000
+COHORT_MAX_POINTS = 200000
+
+
+def plotly_available():
+    return importlib.util.find_spec('plotly') is not None
+
+
+def to_figure(spec):
+    """Validated plotly Figure for a spec.
+
+    st.plotly_chart validates plain dicts on every call (milliseconds for
+    the profile figure) but takes a Figure as already validated, so cache
+    the Figure rather than the spec when it is rendered repeatedly.
+    """
+    import plotly.graph_objects as go
+    return go.Figure(spec)
+
+
+def dimension_figure(dim_name, result):
+    """Bar chart of one dimension's all_scores, dominant type highlighted"""
+    types = list(result['all_scores'])
+    counts = list(result['all_scores'].values())
+    total = result['total_questions']
+    return {
+        'data': [{
+            'type': 'bar',
+            'x': types,
+            'y': counts,
+            'text': [f"{count / total * 100:.0f}%" for count in counts],
+            'textposition': 'auto',
+            'marker': {'color': [DOMINANT_COLOR if type_name == result['dominant_type'] else OTHER_COLOR
+                                 for type_name in types]},
+            'hovertemplate': '%{x}: %{y} answers (%{text})<extra></extra>',
+        }],
+        'layout': {
+            'title': {'text': dimension_clean_name(dim_name)},
+            'height': 300,
+            'margin': {'l': 40, 'r': 10, 't': 50, 'b': 40},
+            'yaxis': {'title': {'text': 'Answers'}, 'dtick': 1},
+            'showlegend': False,
+        },
+    }
+
+
+def profile_figure(section_results):
+    """Strength of the dominant type in every dimension, one trace per section"""
+    data = []
+    dimension_count = 0
+    for section_key, filename in ASSESSMENT_FILES:
+        results = section_results.get(section_key) or {}
+        if not results:
+            continue
+        dimension_count += len(results)
+        data.append({
+            'type': 'bar',
+            'orientation': 'h',
+            'name': SECTION_TITLES[section_key],
+            'y': [dimension_clean_name(dim_name) for dim_name in results],
+            'x': [result['percentage'] for result in results.values()],
+            'customdata': [result['dominant_type'] for result in results.values()],
+            'marker': {'color': SECTION_COLORS[section_key]},
+            'hovertemplate': '%{y}<br>%{customdata}: %{x:.1f}%<extra></extra>',
+        })
+    return {
+        'data': data,
+        'layout': {
+            'title': {'text': 'Strength of your dominant type per dimension'},
+            'height': 120 + 18 * dimension_count,
+            'margin': {'l': 10, 'r': 10, 't': 60, 'b': 40},
+            'xaxis': {'title': {'text': 'Strength (%)'}, 'range': [0, 100]},
+            'yaxis': {'autorange': 'reversed', 'automargin': True},
+            'legend': {'orientation': 'h', 'y': 1.02, 'yanchor': 'bottom'},
+            'barmode': 'group',
+        },
+    }
+
+
+def cohort_figure(section_key, dimensions, strengths, max_points=COHORT_MAX_POINTS, seed=0):
+    """Strip plot of every respondent's strength in each dimension of a section.
+
+    ``strengths`` is an (respondents x dimensions) array of percentages with
+    NaN for unanswered dimensions. Respondents are sampled down so the
+    figure holds at most ``max_points`` points.
+    """
+    # Imported here so single-respondent figures do not pay for loading numpy
+    import numpy as np
+
+    strengths = np.asarray(strengths, dtype=np.float32)
+    respondents = strengths.shape[0]
+    if respondents * len(dimensions) > max_points:
+        keep = max(1, max_points // max(1, len(dimensions)))
+        rows = np.sort(np.random.default_rng(seed).choice(respondents, keep, replace=False))
+        strengths = strengths[rows]
+    shown = strengths.shape[0]
+    trace_type = 'scattergl' if shown * len(dimensions) > WEBGL_THRESHOLD else 'scatter'
+
+    jitter = np.random.default_rng(seed).uniform(-0.3, 0.3, size=shown).astype(np.float32)
+    data = []
+    for dim_idx, dimension in enumerate(dimensions):
+        values = strengths[:, dim_idx]
+        answered = ~np.isnan(values)
+        data.append({
+            'type': trace_type,
+            'mode': 'markers',
+            'name': dimension.clean_name,
+            'x': (dim_idx + jitter[answered]).round(3).tolist(),
+            'y': values[answered].round(1).tolist(),
+            'marker': {'size': 3, 'opacity': 0.4, 'color': SECTION_COLORS.get(section_key)},
+            'hovertemplate': f'{dimension.clean_name}: %{{y:.1f}}%<extra></extra>',
+        })
+    sampled = f" (sample of {shown:,} of {respondents:,})" if shown < respondents else f" ({respondents:,})"
+    return {
+        'data': data,
+        'layout': {
+            'title': {'text': f"{SECTION_TITLES.get(section_key, section_key)}: strength per respondent{sampled}"},
+            'height': 500,
+            'showlegend': False,
+            'xaxis': {'tickmode': 'array', 'tickvals': list(range(len(dimensions))),
+                      'ticktext': [dimension.clean_name for dimension in dimensions], 'tickangle': -45},
+            'yaxis': {'title': {'text': 'Strength (%)'}, 'range': [0, 105]},
+        },
+    }
@@ -0,0 +1,164 @@
+"""Lightweight result exports: JSON lines, CSV and Parquet.
+
+Every writer takes scored outputs shaped like bulk_score.score_record():
+
+    {'id': ..., 'client_name': ..., 'results': {section_key: results},
+     'profile': ..., 'error': ...}
+
+where results are the calculate_results() dicts. JSON keeps them whole;
+CSV and Parquet get one row per respondent with the dominant type and
+strength of every dimension. Writers can be fed one respondent or many
+chunks, so the same code serves the app's per-respondent downloads and
+bulk_score.py. Parquet needs pyarrow, which is only imported when used.
+"""
+import csv
+import importlib.util
+import io
+import json
+
+from assessment_core import ASSESSMENT_FILES
+
+SECTION_KEYS = [section_key for section_key, filename in ASSESSMENT_FILES]
+
+EXPORT_FORMATS = {
+    'json': ('application/json', '.json'),
+    'csv': ('text/csv', '.csv'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+
+
+def available_formats():
+    """Export formats usable in this environment"""
+    return [output_format for output_format in EXPORT_FORMATS
+            if output_format != 'parquet' or importlib.util.find_spec('pyarrow') is not None]
+
+
+def result_columns(questionnaire):
+    """(section_key, dimension name, column label) for every dimension"""
+    return [
+        (section_key, dimension.name, f"{section_key}/{dimension.clean_name}")
+        for section_key in SECTION_KEYS
+        for dimension in questionnaire.sections[section_key]
+    ]
+
+
+def _dimension_values(output, columns):
+    results = output.get('results', {})
+    for section_key, dim_name, label in columns:
+        result = results.get(section_key, {}).get(dim_name)
+        if result is None:
+            yield None, None
+        else:
+            yield result['dominant_type'], result['percentage']
+
+
+class JsonlResultWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, scored):
+        for output in scored:
+            self.stream.write(json.dumps(output, ensure_ascii=False) + '\n')
+
+    def close(self):
+        pass
+
+
+class CsvResultWriter:
+    """One row per respondent: dominant type and strength for every dimension"""
+
+    def __init__(self, stream, questionnaire):
+        self.columns = result_columns(questionnaire)
+        self.writer = csv.writer(stream)
+        header = ['id', 'client_name']
+        for section_key, dim_name, label in self.columns:
+            header += [f"{label} dominant", f"{label} %"]
+        self.writer.writerow(header + ['profile', 'error'])
+
+    def write(self, scored):
+        for output in scored:
+            row = [output['id'], output['client_name']]
+            for dominant, percentage in _dimension_values(output, self.columns):
+                if dominant is None:
+                    row += ['', '']
+                else:
+                    row += [dominant, round(percentage, 2)]
+            self.writer.writerow(row + [output.get('profile', ''), output.get('error', '')])
+
+    def close(self):
+        pass
+
+
+class ParquetResultWriter:
+    """Same columns as the CSV, typed, written as one row group per batch.
+
+    Rows are buffered until ``row_group_size`` is reached and then appended
+    to the file as a row group, so memory is bounded by the group size.
+    """
+
+    def __init__(self, sink, questionnaire, row_group_size=10000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.columns = result_columns(questionnaire)
+        fields = [pa.field('id', pa.string()), pa.field('client_name', pa.string())]
+        for section_key, dim_name, label in self.columns:
+            fields += [pa.field(f"{label} dominant", pa.string()),
+                       pa.field(f"{label} %", pa.float64())]
+        fields += [pa.field('profile', pa.string()), pa.field('error', pa.string())]
+        self.schema = pa.schema(fields)
+        self.row_group_size = row_group_size
+        self._writer = pq.ParquetWriter(sink, self.schema, compression='zstd')
+        self._buffer = [[] for field in fields]
+
+    def write(self, scored):
+        for output in scored:
+            client_name = output['client_name']
+            values = [str(output['id']), str(client_name) if client_name is not None else None]
+            for dominant, percentage in _dimension_values(output, self.columns):
+                values += [dominant, percentage]
+            values += [output.get('profile'), output.get('error')]
+            for column, value in zip(self._buffer, values):
+                column.append(value)
+            if len(self._buffer[0]) >= self.row_group_size:
+                self._flush()
+
+    def _flush(self):
+        if self._buffer[0]:
+            # Emptied first, so a batch that fails to convert is not retried by close()
+            columns, self._buffer = self._buffer, [[] for field in self.schema]
+            table = self._pa.Table.from_arrays(
+                [self._pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+                schema=self.schema)
+            self._writer.write_table(table)
+
+    def close(self):
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+
+
+def result_writer(output_format, stream, questionnaire):
+    """Writer for output_format; Parquet needs a binary stream"""
+    if output_format == 'csv':
+        return CsvResultWriter(stream, questionnaire)
+    if output_format == 'parquet':
+        return ParquetResultWriter(stream, questionnaire)
+    return JsonlResultWriter(stream)
+
+
+def export_respondent(output_format, client_name, questionnaire, section_results, profile):
+    """(bytes, mime type, file extension) for one respondent's results"""
+    output = {'id': 1, 'client_name': client_name, 'results': section_results, 'profile': profile}
+    mime, extension = EXPORT_FORMATS[output_format]
+    if output_format == 'json':
+        data = json.dumps(output, ensure_ascii=False, indent=2).encode('utf-8')
+        return data, mime, extension
+    stream = io.BytesIO() if output_format == 'parquet' else io.StringIO(newline='')
+    writer = result_writer(output_format, stream, questionnaire)
+    writer.write([output])
+    writer.close()
+    data = stream.getvalue()
+    return (data.encode('utf-8') if isinstance(data, str) else data), mime, extension
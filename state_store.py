@@ -0,0 +1,202 @@
+"""Assessment progress kept outside the Streamlit process.
+
+A SessionState is the compact part of a session that cannot be rebuilt:
+who the client is, where they are in the questionnaire and their answers,
+one answer string per section (see assessment_core.encode_answer_string).
+Answer strings only mean something for the questionnaire version they
+were encoded against, so that version is stored with them.
+It is stored under the client id, so any app process can pick up a
+session that another one started, and a restart loses nothing.
+
+Backends store versioned JSON blobs. put() is a compare-and-set on the
+version, so two processes writing the same session cannot silently
+overwrite each other; the loser gets StateConflict and reloads.
+SqliteStateBackend shares one database file between the processes of a
+host; MemoryStateBackend is a local key-value stand-in for single-process
+runs and for trying out the app without a database.
+
+StateStore puts a read-through cache in front of a backend. Within ttl
+seconds a cached state is served without touching the backend; after
+that only the version is read back, and the blob is fetched and decoded
+again only when another process has changed it.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from assessment_store import SCHEMA, connect
+
+SessionState = namedtuple(
+    'SessionState',
+    'client_id client_name questionnaire_version current_section current_dimension complete answers version',
+    defaults=(0,))
+
+
+class StateConflict(Exception):
+    """The stored state changed since it was read"""
+
+
+def encode_state(state):
+    return json.dumps({
+        'client_name': state.client_name,
+        'questionnaire_version': state.questionnaire_version,
+        'current_section': state.current_section,
+        'current_dimension': state.current_dimension,
+        'complete': state.complete,
+        'answers': state.answers,
+    }, ensure_ascii=False, separators=(',', ':'))
+
+
+def decode_state(client_id, data, version):
+    fields = json.loads(data)
+    # States saved before versions were recorded match no questionnaire
+    return SessionState(client_id, fields['client_name'], fields.get('questionnaire_version'),
+                        fields['current_section'], fields['current_dimension'], fields['complete'],
+                        fields['answers'], version)
+
+
+class MemoryStateBackend:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def version(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def get(self, key):
+        """(version, data) for key, or None"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key, data, expected_version):
+        """Store data if key is still at expected_version (0 if new); returns the new version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry[0] if entry is not None else 0) != expected_version:
+                raise StateConflict(key)
+            self._entries[key] = (expected_version + 1, data)
+            return expected_version + 1
+
+    def close(self):
+        pass
+
+
+class SqliteStateBackend:
+    """States in the session_state table of an assessment database.
+
+    Given the AssessmentStore of the same database, puts are queued on its
+    writer rather than committed here. They then return before the
+    compare-and-set runs; a put that loses it makes the next version()
+    call report the key as unknown, so StateStore reads the winner back.
+    """
+
+    def __init__(self, path, store=None):
+        self._connection = connect(path)
+        self._connection.executescript(SCHEMA)
+        self._store = store
+        self._lock = threading.Lock()
+
+    def version(self, key):
+        if self._store is not None and self._store.take_state_conflict(key):
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT version FROM session_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def get(self, key):
+        if self._store is not None:
+            # Include this process's queued puts
+            self._store.flush()
+        with self._lock:
+            return self._connection.execute(
+                'SELECT version, data FROM session_state WHERE key = ?', (key,)).fetchone()
+
+    def put(self, key, data, expected_version):
+        if self._store is not None:
+            return self._store.record_state(key, data, expected_version)
+        with self._lock, self._connection:
+            if expected_version == 0:
+                cursor = self._connection.execute(
+                    'INSERT INTO session_state (key, version, data, updated_at) VALUES (?, 1, ?, ?) '
+                    'ON CONFLICT (key) DO NOTHING', (key, data, time.time()))
+            else:
+                cursor = self._connection.execute(
+                    'UPDATE session_state SET version = version + 1, data = ?, updated_at = ? '
+                    'WHERE key = ? AND version = ?', (data, time.time(), key, expected_version))
+            if cursor.rowcount != 1:
+                raise StateConflict(key)
+        return expected_version + 1
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def make_state_backend(name, db_path=None, store=None):
+    """Backend named 'sqlite' (stored in db_path, written through store if given) or 'memory'"""
+    if name == 'sqlite':
+        return SqliteStateBackend(db_path, store)
+    if name == 'memory':
+        return MemoryStateBackend()
+    raise ValueError(f"unknown session state backend {name!r}")
+
+
+class StateStore:
+    def __init__(self, backend, max_entries=1024, ttl=2.0):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, state):
+        with self._lock:
+            self._entries[state.client_id] = (state, time.monotonic())
+            self._entries.move_to_end(state.client_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, client_id, refresh=False):
+        """SessionState for client_id, or None; refresh checks the backend version first"""
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry is not None:
+                self._entries.move_to_end(client_id)
+        if entry is not None:
+            state, checked_at = entry
+            if not refresh and time.monotonic() - checked_at < self.ttl:
+                self.hits += 1
+                return state
+            if self.backend.version(client_id) == state.version:
+                self.hits += 1
+                self._remember(state)
+                return state
+
+        self.misses += 1
+        stored = self.backend.get(client_id)
+        if stored is None:
+            return None
+        state = decode_state(client_id, stored[1], stored[0])
+        self._remember(state)
+        return state
+
+    def put(self, state):
+        """Save state over the version it was read at; returns it with its new version"""
+        try:
+            version = self.backend.put(state.client_id, encode_state(state), state.version)
+        except StateConflict:
+            with self._lock:
+                self._entries.pop(state.client_id, None)
+            raise
+        state = state._replace(version=version)
+        self._remember(state)
+        return state
+
+    def close(self):
+        self.backend.close()